@@ -13,10 +13,11 @@ setup(
         "pyperclip>=1.9",
         "colorama>=0.4.6",
         "flask>=3.0.0",
+        "flask-sock>=0.7.0",
     ],
     entry_points={
         "console_scripts": [
-            "voice-commander=voice_commander.main:main",
+            "voice-commander=voice_commander.cli:main",
         ],
     },
     python_requires=">=3.10",
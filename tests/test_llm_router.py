@@ -0,0 +1,160 @@
+"""Router behaviour against local stub Ollama servers (no real LLM needed)."""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from voice_commander.llm_router import LLMError, Router
+
+
+def _cfg(**overrides) -> dict:
+    cfg = {
+        "ollama_timeout": 10,
+        "ollama_hedge_min_ms": 100,
+        "ollama_hedge_default_ms": 300,
+        "ollama_backend_cooldown_sec": 15,
+        "ollama_health_interval_sec": 3600,
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+class StubOllama:
+    """Streams `tokens` from /api/generate, one every `interval` seconds after `delay`."""
+
+    def __init__(self, tokens=("git", " status"), delay=0.0, interval=0.0, status=200):
+        self.tokens = tokens
+        self.delay = delay
+        self.interval = interval
+        self.status = status
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests += 1
+                self.send_response(stub.status)
+                self.end_headers()
+                if stub.status != 200:
+                    return
+                try:
+                    time.sleep(stub.delay)
+                    for token in stub.tokens:
+                        self.wfile.write((json.dumps({"response": token, "done": False}) + "\n").encode())
+                        self.wfile.flush()
+                        time.sleep(stub.interval)
+                    self.wfile.write(b'{"response": "", "done": true}\n')
+                except OSError:
+                    pass  # client cancelled (hedge lost / deadline)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    started = []
+
+    def make(**kwargs) -> StubOllama:
+        stub = StubOllama(**kwargs)
+        started.append(stub)
+        return stub
+
+    yield make
+    for stub in started:
+        stub.close()
+
+
+def _refused_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_generate_single_backend(stubs):
+    stub = stubs()
+    text, backend, attempts = Router([stub.url], _cfg()).generate({"model": "m", "prompt": "x"})
+    assert (text, backend.url, attempts) == ("git status", stub.url, 1)
+    assert backend.outstanding == 0
+
+
+def test_hedges_to_second_backend_when_first_token_is_late(stubs):
+    slow = stubs(delay=3.0)
+    fast = stubs()
+    router = Router([slow.url, fast.url], _cfg())
+    router.backends[1].outstanding = 1  # make the slow backend the first pick
+
+    t0 = time.monotonic()
+    text, backend, attempts = router.generate({"model": "m", "prompt": "x"})
+    assert backend.url == fast.url
+    assert attempts == 2
+    assert time.monotonic() - t0 < 2.0
+
+
+def test_fails_over_on_http_500(stubs):
+    broken = stubs(status=500)
+    good = stubs()
+    router = Router([broken.url, good.url], _cfg())
+    router.backends[1].outstanding = 1
+
+    text, backend, attempts = router.generate({"model": "m", "prompt": "x"})
+    assert backend.url == good.url
+    assert attempts == 2
+    assert broken.requests == 1
+
+
+def test_all_http_errors_is_not_a_connection_error(stubs):
+    router = Router([stubs(status=500).url], _cfg())
+    with pytest.raises(LLMError) as exc:
+        router.generate({"model": "m", "prompt": "x"})
+    assert not exc.value.connection
+
+
+def test_fails_over_on_connection_refused(stubs):
+    good = stubs()
+    refused = _refused_url()
+    router = Router([refused, good.url], _cfg())
+    router.backends[1].outstanding = 1
+
+    text, backend, attempts = router.generate({"model": "m", "prompt": "x"})
+    assert backend.url == good.url
+    assert not router.backends[0].healthy  # in cooldown
+    assert router.pick() is router.backends[1]
+
+
+def test_only_refused_backends_is_a_connection_error():
+    router = Router([_refused_url()], _cfg())
+    with pytest.raises(LLMError) as exc:
+        router.generate({"model": "m", "prompt": "x"})
+    assert exc.value.connection
+
+
+def test_total_deadline_cuts_off_trickling_backend(stubs):
+    trickle = stubs(tokens=["x"] * 100, interval=0.1)
+    router = Router([trickle.url], _cfg(ollama_timeout=1))
+
+    t0 = time.monotonic()
+    with pytest.raises(LLMError) as exc:
+        router.generate({"model": "m", "prompt": "x"})
+    assert time.monotonic() - t0 < 2.0
+    assert not exc.value.connection  # reachable but slow
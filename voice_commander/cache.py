@@ -0,0 +1,194 @@
+"""Content-hash result cache for repeated /asr uploads.
+
+Results are keyed by a SHA-256 of the audio bytes plus every parameter that
+changes the transcription. The memory tier is an LRU bounded by entry count
+and approximate size; entries expire after a TTL. An optional disk tier keeps
+results across restarts; expired files are swept at most every
+_DISK_SWEEP_INTERVAL seconds, in the background of a put().
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO
+
+from .config import load_config
+
+_HASH_CHUNK = 1024 * 1024
+_DISK_SWEEP_INTERVAL = 300
+
+
+def cache_key(stream: BinaryIO, **params) -> str:
+    """Hash an audio stream (rewound afterwards) together with `params`."""
+    h = hashlib.sha256()
+    while True:
+        chunk = stream.read(_HASH_CHUNK)
+        if not chunk:
+            break
+        h.update(chunk)
+    stream.seek(0)
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache of JSON-serializable result dicts."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_sec: float,
+        disk_dir: str | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries: OrderedDict[str, tuple[float, int, dict]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, _, value = entry
+                if now - stored_at <= self.ttl_sec:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+        found = self._disk_get(key, now)
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, *found)
+        return found[1]
+
+    def put(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._insert(key, now, value)
+        self._disk_put(key, now, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # ── Internals (memory tier, caller holds _lock) ───────────
+
+    def _insert(self, key: str, stored_at: float, value: dict) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = len(json.dumps(value, ensure_ascii=False))
+        self._entries[key] = (stored_at, size, value)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # ── Disk tier ─────────────────────────────────────────────
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, dict] | None:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            stored_at, value = float(entry["stored_at"]), entry["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # missing, truncated or not one of ours
+        if now - stored_at > self.ttl_sec or not isinstance(value, dict):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return stored_at, value
+
+    def _disk_put(self, key: str, stored_at: float, value: dict) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        if stored_at - self._last_sweep >= _DISK_SWEEP_INTERVAL:
+            self._last_sweep = stored_at
+            threading.Thread(target=self._disk_sweep, daemon=True, name="cache-sweep").start()
+
+    def _disk_sweep(self) -> None:
+        """Delete disk entries older than the TTL (file mtime is the store time)."""
+        cutoff = time.time() - self.ttl_sec
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResultCache | None:
+    """Return the process-wide cache, or None when caching is disabled."""
+    global _cache
+    cfg = load_config()
+    if not cfg["cache_enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(
+                max_entries=cfg["cache_max_entries"],
+                max_bytes=int(cfg["cache_max_mb"] * 1024 * 1024),
+                ttl_sec=cfg["cache_ttl_sec"],
+                disk_dir=cfg["cache_dir"],
+            )
+    return _cache
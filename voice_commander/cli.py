@@ -0,0 +1,39 @@
+"""Command-line entry point: dispatches to the hotkey app or a subcommand.
+
+`voice-commander listen` runs the same app always listening instead of push-to-talk.
+
+Subcommands import only what they need, so `voice-commander serve`,
+`stats` and `loadtest` never load keyboard, sounddevice, pyperclip or colorama.
+"""
+
+import sys
+import time
+
+
+def main():
+    started_at = time.perf_counter()
+    argv = sys.argv[1:]
+    command = argv[0] if argv and not argv[0].startswith("-") else None
+
+    if command == "serve":
+        from .serve import main as serve_main
+        serve_main(argv[1:], started_at=started_at)
+    elif command == "stats":
+        from .stats import main as stats_main
+        stats_main(argv[1:])
+    elif command == "loadtest":
+        from .loadtest import main as loadtest_main
+        loadtest_main(argv[1:])
+    elif command == "listen":
+        from .main import main as hotkey_main
+        hotkey_main(listen=True)
+    elif command is None:
+        from .main import main as hotkey_main
+        hotkey_main()
+    else:
+        sys.stderr.write(f"Unknown command: {command}\nUsage: voice-commander [serve|listen|stats|loadtest]\n")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 """Command generation via Ollama LLM."""
 
 import re
+import threading
 import time
 from dataclasses import dataclass
 
 import requests
 
 from .config import load_config
+from .llm_router import LLMError, backend_urls, get_router
+from .tracing import span
+
+
+_last_used: float | None = None  # None until we have loaded the model
+_cold_pending = True  # not used by us yet (startup or evicted); consumed by the next command
 
 
 @dataclass
@@ -14,6 +21,9 @@ class CommandResult:
     command: str
     model: str
     latency_ms: int
+    backend: str = ""
+    attempts: int = 1  # >1 when the request was hedged or failed over
+    cold_start: bool = False  # first call since startup or eviction: Ollama (re)loaded the model
 
 
 def _clean_command(raw: str) -> str:
@@ -30,6 +40,9 @@ def _clean_command(raw: str) -> str:
 def generate_command(transcription: str) -> CommandResult:
     """Send transcription to Ollama and return the generated command.
 
+    The request is routed across `ollama_backends` (see llm_router); if every
+    backend fails for `ollama_model`, `ollama_fallback_model` is tried once.
+
     Args:
         transcription: the user's spoken text transcribed by Whisper.
 
@@ -37,29 +50,93 @@ def generate_command(transcription: str) -> CommandResult:
         CommandResult with the cleaned command, model name, and latency.
     """
     cfg = load_config()
-    url = f"{cfg['ollama_url']}/api/generate"
-    payload = {
-        "model": cfg["ollama_model"],
-        "system": cfg["ollama_system_prompt"],
-        "prompt": transcription,
-        "stream": False,
-    }
+    router = get_router()
+    models = [cfg["ollama_model"]]
+    if cfg["ollama_fallback_model"]:
+        models.append(cfg["ollama_fallback_model"])
 
+    global _last_used, _cold_pending
+    # Read before the request: prefetch() may already have set _last_used
+    cold = _cold_pending
+    _last_used = time.monotonic()
     t0 = time.perf_counter()
-    try:
-        resp = requests.post(url, json=payload, timeout=60)
-        resp.raise_for_status()
-    except requests.ConnectionError:
-        raise RuntimeError(
-            "No se pudo conectar a Ollama. Asegurate de que este corriendo: ollama serve"
-        )
-    except requests.HTTPError as e:
-        raise RuntimeError(f"Ollama error: {e}")
+    for model in models:
+        payload = {
+            "model": model,
+            "system": cfg["ollama_system_prompt"],
+            "prompt": transcription,
+        }
+        try:
+            with span("llm.request", model=model):
+                raw, backend, attempts = router.generate(payload)
+            break
+        except LLMError as e:
+            error = e
+    else:
+        if error.connection:
+            raise RuntimeError(
+                "No se pudo conectar a Ollama. Asegurate de que este corriendo: ollama serve"
+            )
+        raise RuntimeError(f"Ollama error: {error}")
     latency_ms = int((time.perf_counter() - t0) * 1000)
+    _cold_pending = False
 
-    raw = resp.json().get("response", "")
     return CommandResult(
         command=_clean_command(raw),
-        model=cfg["ollama_model"],
+        model=model,
         latency_ms=latency_ms,
+        backend=backend.url,
+        attempts=attempts,
+        cold_start=cold,
     )
+
+
+def prefetch() -> None:
+    """Ask Ollama to load the model in the background (no prompt, no output)."""
+    global _last_used
+    cfg = load_config()
+    backend = get_router().pick()
+    _last_used = time.monotonic()
+
+    def _load():
+        try:
+            requests.post(
+                f"{backend.url}/api/generate",
+                json={"model": cfg["ollama_model"]},
+                timeout=60,
+            )
+        except requests.RequestException:
+            pass
+
+    threading.Thread(target=_load, daemon=True, name="ollama-prefetch").start()
+
+
+def unload_model() -> bool:
+    """Ask every Ollama backend to evict our models now (keep_alive=0)."""
+    global _last_used, _cold_pending
+    if _last_used is None:
+        return False
+    cfg = load_config()
+    _last_used = None
+    _cold_pending = True
+    models = [m for m in (cfg["ollama_model"], cfg["ollama_fallback_model"]) if m]
+    unloaded = False
+    for url in backend_urls(cfg):
+        for model in models:
+            try:
+                requests.post(
+                    f"{url.rstrip('/')}/api/generate",
+                    json={"model": model, "keep_alive": 0},
+                    timeout=10,
+                )
+                unloaded = True
+            except requests.RequestException:
+                pass
+    return unloaded
+
+
+def idle_seconds() -> float | None:
+    """Seconds since the model was last used, or None if it is not loaded by us."""
+    if _last_used is None:
+        return None
+    return time.monotonic() - _last_used
@@ -2,6 +2,11 @@
 
 import json
 import os
+import threading
+import time
+from typing import Callable
+
+from .tracing import span
 
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -18,15 +23,34 @@ DEFAULTS = {
     "whisper_model": "medium",
     "whisper_device": "cuda",
     "whisper_compute_type": "float16",
+    "whisper_cpu_threads": 0,  # 0 = CTranslate2 default
+    "fake_model_rtf": 0.1,  # decode time / audio time for whisper_model "fake" (load testing)
     "whisper_initial_prompt": (
         "KAPS, Syion, Komoco, llavetina, getSalesOrderToPurchaseOrder, "
         "aftersales, IIS Express, stored procedure, PowerShell, git, "
         "docker, dotnet, npm, SQL Server, Visual Studio"
     ),
 
+    # Audio preprocessing before Whisper (resample to 16 kHz always happens)
+    "preprocess_enabled": True,
+    "preprocess_trim_db": -45.0,  # frames below this level count as silence
+    "preprocess_trim_pad_ms": 200,  # silence kept around speech after trimming
+    "preprocess_target_peak_db": -1.0,
+    "preprocess_max_gain_db": 20.0,
+
+    # Unload Whisper/Ollama models after this many idle seconds (0 = keep resident)
+    "idle_unload_sec": 0,
+
     # Ollama LLM
     "ollama_url": "http://localhost:11434",
     "ollama_model": "qwen2.5-coder:14b-instruct",
+    "ollama_fallback_model": None,  # smaller model tried if every backend fails with ollama_model
+    "ollama_backends": [],  # list of Ollama URLs to route across; empty = [ollama_url]
+    "ollama_timeout": 60,
+    "ollama_hedge_min_ms": 500,  # floor for the hedge deadline (p95 time-to-first-token)
+    "ollama_hedge_default_ms": 3000,  # hedge deadline until enough TTFT samples exist
+    "ollama_backend_cooldown_sec": 15,  # how long an unreachable backend is skipped
+    "ollama_health_interval_sec": 10,
     "ollama_system_prompt": (
         "You are a terminal command generator for a Windows 11 machine.\n"
         "The user speaks in Spanish (or mixed Spanish/English). Interpret natural language project references.\n\n"
@@ -102,6 +126,39 @@ DEFAULTS = {
     "http_host": "0.0.0.0",
     "http_port": 9090,
     "http_max_content_mb": 25,
+    "http_workers": 0,  # >0: decode in N worker processes, each with its own model (serve mode)
+    "http_worker_cores": 0,  # cores pinned per worker; 0 = cpu_count // workers
+    "http_admin_token": None,  # required as "Authorization: Bearer <token>" on /admin/*; None = localhost only
+
+    # Live dictation over WebSocket (/stream)
+    "stream_max_sessions": 8,
+    "stream_max_buffer_sec": 30,  # per-session audio cap; longer utterances are force-committed
+    "stream_partial_interval_sec": 1.0,
+    "stream_silence_ms": 600,  # silence that ends an utterance
+    "stream_preroll_ms": 300,
+    "vad_threshold_db": -40.0,
+
+    # Always-listening mode (`voice-commander listen`); gate threshold is vad_threshold_db
+    "listen_block_ms": 100,  # audio block per VAD step; larger = fewer wakeups while idle
+    "listen_silence_ms": 800,  # silence that ends an utterance
+    "listen_preroll_ms": 300,
+    "listen_min_speech_ms": 300,  # shorter bursts (clicks, coughs) never reach Whisper
+    "listen_max_utterance_sec": 15,
+    "listen_wake_word": None,  # e.g. "commander": utterances must start with it
+    "listen_wake_window_sec": 2.0,  # audio decoded first to look for the wake word
+    "listen_prefixes": {"comando": "command", "texto": "text"},
+
+    # /asr result cache (keyed by audio hash + decode parameters)
+    "cache_enabled": True,
+    "cache_max_entries": 512,
+    "cache_max_mb": 16,
+    "cache_ttl_sec": 3600,
+    "cache_dir": None,  # set to a directory to enable the on-disk tier
+
+    # Tracing (Chrome trace / Perfetto JSON per interaction)
+    "trace_enabled": False,
+    "trace_dir": os.path.join(_BASE_DIR, "logs", "traces"),
+    "trace_http_sample_rate": 0.1,  # fraction of HTTP requests traced when enabled
 
     # Execution
     "exec_timeout": 30,
@@ -112,12 +169,56 @@ DEFAULTS = {
 }
 
 
+_overrides: dict = {}
+
+
+def set_overrides(**overrides) -> None:
+    """Apply process-wide overrides (e.g. CLI flags) on top of config.json."""
+    _overrides.update(overrides)
+
+
+def get_overrides() -> dict:
+    """Copy of the current overrides, e.g. to hand on to worker processes."""
+    return dict(_overrides)
+
+
 def load_config() -> dict:
     """Load config from defaults, overridden by config.json if present."""
-    cfg = dict(DEFAULTS)
-    config_path = os.path.join(_BASE_DIR, "config.json")
-    if os.path.exists(config_path):
-        with open(config_path, "r", encoding="utf-8") as f:
-            overrides = json.load(f)
-        cfg.update(overrides)
+    with span("config.load"):
+        cfg = dict(DEFAULTS)
+        config_path = os.path.join(_BASE_DIR, "config.json")
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+            cfg.update(overrides)
+        cfg.update(_overrides)
     return cfg
+
+
+def watch_config(on_change: Callable[[dict], None], interval: float = 2.0) -> threading.Thread:
+    """Poll config.json and call `on_change(cfg)` whenever it is modified."""
+    config_path = os.path.join(_BASE_DIR, "config.json")
+
+    def _mtime() -> float | None:
+        try:
+            return os.path.getmtime(config_path)
+        except OSError:
+            return None
+
+    def _run():
+        last = _mtime()
+        while True:
+            time.sleep(interval)
+            current = _mtime()
+            if current == last:
+                continue
+            last = current
+            try:
+                cfg = load_config()
+            except (OSError, ValueError):
+                continue  # half-written or invalid JSON; pick it up on the next change
+            on_change(cfg)
+
+    thread = threading.Thread(target=_run, daemon=True, name="config-watch")
+    thread.start()
+    return thread
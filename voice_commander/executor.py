@@ -4,6 +4,7 @@ import subprocess
 from dataclasses import dataclass
 
 from .config import load_config
+from .tracing import span
 
 
 @dataclass
@@ -24,14 +25,15 @@ def run_command(command: str) -> ExecResult:
     """
     cfg = load_config()
     try:
-        result = subprocess.run(
-            ["pwsh", "-Command", command],
-            capture_output=True,
-            text=True,
-            timeout=cfg["exec_timeout"],
-            encoding="utf-8",
-            errors="replace",
-        )
+        with span("exec.run"):
+            result = subprocess.run(
+                ["pwsh", "-Command", command],
+                capture_output=True,
+                text=True,
+                timeout=cfg["exec_timeout"],
+                encoding="utf-8",
+                errors="replace",
+            )
         return ExecResult(
             stdout=result.stdout,
             stderr=result.stderr,
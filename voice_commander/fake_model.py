@@ -0,0 +1,44 @@
+"""Stand-in for faster_whisper.WhisperModel, selected with whisper_model "fake".
+
+Used by `voice-commander serve --fake-model` for load testing: instead of
+running inference it sleeps for `rtf` times the audio duration, inside the
+segment generator like a real decode, so transcribe_lock, the worker pool
+and the HTTP layer see realistic hold times without a model download.
+"""
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+FAKE_MODEL = "fake"
+SAMPLE_RATE = 16000
+
+
+class FakeWhisperModel:
+    def __init__(self, rtf: float = 0.1):
+        self.rtf = rtf
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        word_timestamps: bool = False,
+        **kwargs,
+    ):
+        duration = len(audio) / SAMPLE_RATE
+        info = SimpleNamespace(language=language or "en", duration=duration)
+        return self._segments(duration, word_timestamps), info
+
+    def _segments(self, duration: float, word_timestamps: bool):
+        time.sleep(duration * self.rtf)
+        text = f"fake transcript of {duration:.1f} seconds"
+        words = None
+        if word_timestamps:
+            tokens = text.split()
+            step = duration / len(tokens)
+            words = [
+                SimpleNamespace(start=i * step, end=(i + 1) * step, word=f" {w}", probability=1.0)
+                for i, w in enumerate(tokens)
+            ]
+        yield SimpleNamespace(id=1, start=0.0, end=duration, text=f" {text}", words=words)
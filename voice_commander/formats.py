@@ -0,0 +1,89 @@
+"""Incremental subtitle / segment writers for the /asr endpoint.
+
+Each writer consumes an iterator of faster-whisper segments and yields text
+chunks as soon as a segment is available, so the HTTP layer can stream them.
+"""
+
+import json
+from typing import Iterable, Iterator
+
+MIMETYPES = {
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+    "tsv": "text/tab-separated-values",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def format_timestamp(seconds: float, decimal_marker: str = ".") -> str:
+    """Format seconds as HH:MM:SS.mmm (or HH:MM:SS,mmm for SRT)."""
+    ms = int(round(max(seconds, 0.0) * 1000))
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_marker}{ms:03d}"
+
+
+def write_srt(segments: Iterable) -> Iterator[str]:
+    for i, seg in enumerate(segments, start=1):
+        start = format_timestamp(seg.start, ",")
+        end = format_timestamp(seg.end, ",")
+        yield f"{i}\n{start} --> {end}\n{seg.text.strip()}\n\n"
+
+
+def write_vtt(segments: Iterable) -> Iterator[str]:
+    yield "WEBVTT\n\n"
+    for seg in segments:
+        start = format_timestamp(seg.start)
+        end = format_timestamp(seg.end)
+        yield f"{start} --> {end}\n{_vtt_text(seg)}\n\n"
+
+
+def write_tsv(segments: Iterable) -> Iterator[str]:
+    yield "start\tend\ttext\n"
+    for seg in segments:
+        text = seg.text.strip().replace("\t", " ")
+        yield f"{int(seg.start * 1000)}\t{int(seg.end * 1000)}\t{text}\n"
+
+
+def write_jsonl(segments: Iterable) -> Iterator[str]:
+    for seg in segments:
+        entry = {
+            "id": seg.id,
+            "start": round(seg.start, 3),
+            "end": round(seg.end, 3),
+            "text": seg.text.strip(),
+        }
+        if seg.words:
+            entry["words"] = [
+                {
+                    "start": round(w.start, 3),
+                    "end": round(w.end, 3),
+                    "word": w.word,
+                    "probability": round(w.probability, 4),
+                }
+                for w in seg.words
+            ]
+        yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+WRITERS = {
+    "srt": write_srt,
+    "vtt": write_vtt,
+    "tsv": write_tsv,
+    "jsonl": write_jsonl,
+}
+
+
+def _vtt_text(seg) -> str:
+    """Cue text; with word timestamps, emit inline <HH:MM:SS.mmm> karaoke tags."""
+    if not seg.words:
+        return seg.text.strip()
+    parts = []
+    for i, w in enumerate(seg.words):
+        word = w.word.strip()
+        if i == 0:
+            parts.append(word)
+        else:
+            parts.append(f"<{format_timestamp(w.start)}>{word}")
+    return " ".join(parts)
@@ -1,30 +1,106 @@
 """HTTP server exposing faster-whisper as a Whisper ASR Webservice-compatible API."""
 
+import json
 import logging
 import os
 import tempfile
 import threading
+import time
 
 from flask import Flask, request, jsonify, Response
-
-from .transcriber import transcribe_file
+from flask_sock import Sock
+
+from . import commander, tracing
+from .cache import cache_key, get_cache
+from .formats import MIMETYPES, WRITERS
+from .streaming import active_sessions, open_session
+from .transcriber import (
+    StreamInfo,
+    TranscriptionResult,
+    model_info,
+    prefetch,
+    reload_model,
+    stream_file,
+    transcribe_file,
+)
 from .config import load_config
-from .logger import log_text
+from .logger import log_command, log_text
+from .tracing import span
+from .workers import WorkerUnavailable
 
 log = logging.getLogger("voice_commander.http")
 
 app = Flask(__name__)
+sock = Sock(app)
+
+# Embedded in the hotkey app the model is loaded before the server starts;
+# `serve` mode flips this to False until its background load completes.
+_readiness: dict = {"ready": True}
+
+# Set by `serve --workers N`: /asr txt/json decodes run in worker processes.
+# Streamed formats and /stream still decode in this process.
+_pool = None
+_WORKER_RETRY_AFTER_SEC = 2  # a lost worker is restarted within seconds
+
+
+def set_readiness(**state) -> None:
+    _readiness.update(state)
+
+
+def set_worker_pool(pool) -> None:
+    global _pool
+    _pool = pool
+
+
+@app.before_request
+def _begin_trace():
+    tracing.begin(
+        f"{request.method} {request.path}",
+        sample_rate=tracing.http_sample_rate(),
+        args=request.query_string.decode("utf-8", "replace"),
+    )
+
+
+@app.teardown_request
+def _finish_trace(exc):
+    tracing.finish()
 
 
 @app.route("/health", methods=["GET"])
 def health():
     cfg = load_config()
+    cache = get_cache()
+    active = model_info()
+    ready = _readiness["ready"]
     return jsonify({
-        "status": "ok",
-        "model": cfg["whisper_model"],
-        "device": cfg["whisper_device"],
-        "compute_type": cfg["whisper_compute_type"],
-    })
+        "status": "ok" if ready else "error" if "error" in _readiness else "loading",
+        "ready": ready,
+        "startup": {k: v for k, v in _readiness.items() if k != "ready"},
+        "model": active["model"] or cfg["whisper_model"],
+        "device": active["device"] or cfg["whisper_device"],
+        "compute_type": active["compute_type"] or cfg["whisper_compute_type"],
+        "model_loaded": active["loaded"],
+        "model_loading": active["loading"],
+        "stream_sessions": active_sessions(),
+        "cache": cache.stats() if cache else None,
+        "workers": _pool.stats()["workers"] if _pool else None,
+        # With workers, the fields above describe the front process's own model
+        "front_model": {
+            "loaded": active["loaded"],
+            "note": "streamed /asr formats and /stream decode here with a second full model, loaded on first use",
+        } if _pool else None,
+    }), 200 if ready else 503
+
+
+@app.route("/admin/reload-model", methods=["POST"])
+def admin_reload_model():
+    """Hot-swap to the Whisper model currently set in config.json (in every worker, with a pool)."""
+    if not _is_admin():
+        return Response("Forbidden", status=403)
+    started = reload_model()
+    if _pool is not None:
+        started = _pool.reload_model() or started
+    return jsonify({"status": "reloading" if started else "unchanged", **model_info()}), 202 if started else 200
 
 
 @app.route("/asr", methods=["POST"])
@@ -36,35 +112,50 @@ def asr():
       Content-Type: multipart/form-data
       Field: audio_file (M4A or OGG)
 
-    Returns: plain text transcription.
+    Returns: plain text transcription, or with output=json a JSON object.
+    With output=srt|vtt|tsv|jsonl the response is streamed (chunked) one
+    segment at a time while decoding continues.
     """
     language = request.args.get("language", None)
     task = request.args.get("task", "transcribe")
     output_format = request.args.get("output", "txt")
+    word_timestamps = request.args.get("word_timestamps", "false").lower() == "true"
+
+    if output_format not in ("txt", "json") and output_format not in WRITERS:
+        return Response(f"Unsupported output format: {output_format}", status=400)
 
     audio_file = request.files.get("audio_file")
     if audio_file is None:
         return Response("No audio_file field in request", status=400)
 
-    suffix = _guess_suffix(audio_file.filename or "audio.m4a")
-    tmp_dir = _get_tmp_dir()
+    if _pool is None:
+        prefetch()
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=tmp_dir) as tmp:
-        audio_file.save(tmp)
-        tmp_path = tmp.name
+    # Streamed formats are never cached; they go straight to the decoder
+    if output_format in WRITERS:
+        with span("http.save_upload"):
+            tmp_path = _save_upload(audio_file)
+        return _stream_response(tmp_path, output_format, language, task, word_timestamps)
 
     try:
-        result = transcribe_file(tmp_path, language=language, task=task)
-    finally:
-        _safe_delete(tmp_path)
+        payload, result, cache_status = _transcribe_upload(audio_file, language, task)
+    except WorkerUnavailable as e:
+        return Response(
+            str(e), status=503, mimetype="text/plain", headers={"Retry-After": str(_WORKER_RETRY_AFTER_SEC)}
+        )
+    if result is None:
+        log.info("[asr] cache hit: %s", payload["text"][:80])
+        return _asr_response(payload, output_format, cache_status)
 
-    cfg = load_config()
     log_text(
         transcription=result.text,
         detected_language=result.language,
         audio_duration_sec=result.audio_duration_sec,
-        whisper_model=cfg["whisper_model"],
+        whisper_model=result.model_key[0],
         latency_stt_ms=result.latency_ms,
+        stt_cold_start=result.cold_start,
+        stt_model_wait_ms=result.model_wait_ms,
+        audio_trimmed_sec=result.trimmed_sec,
     )
 
     log.info(
@@ -75,26 +166,310 @@ def asr():
         result.latency_ms,
     )
 
+    return _asr_response(payload, output_format, cache_status, result)
+
+
+@app.route("/command", methods=["POST"])
+def command():
+    """Fused STT -> LLM pipeline: one round trip from audio to command.
+
+    The client sends:
+      POST /command?language=es
+      Content-Type: multipart/form-data
+      Field: audio_file (M4A or OGG)
+
+    Returns JSON with command, transcript, language, model and per-stage
+    timings. The STT stage is serialized by transcribe_lock (or spread over
+    the worker pool) while the LLM stage runs unlocked, so under concurrent
+    requests one request's LLM call overlaps the next request's decode.
+    """
+    language = request.args.get("language", None)
+    audio_file = request.files.get("audio_file")
+    if audio_file is None:
+        return jsonify({"error": "No audio_file field in request"}), 400
+
+    if _pool is None:
+        prefetch()
+    if commander.idle_seconds() is None:  # LLM not loaded by us yet (startup or evicted)
+        commander.prefetch()
+
+    t0 = time.perf_counter()
+    try:
+        payload, result, cache_status = _transcribe_upload(audio_file, language, "transcribe")
+    except WorkerUnavailable as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(_WORKER_RETRY_AFTER_SEC)}
+    t_stt = time.perf_counter()
+
+    response = {
+        "transcript": payload["text"],
+        "language": payload["language"],
+        "audio_duration_sec": payload["audio_duration_sec"],
+    }
+    if not payload["text"]:
+        return jsonify({**response, "error": "No speech detected"}), 422
+
+    try:
+        cmd = commander.generate_command(payload["text"])
+    except RuntimeError as e:
+        return jsonify({**response, "error": str(e)}), 502
+    t_llm = time.perf_counter()
+
+    cfg = load_config()
+    log_command(
+        transcription=payload["text"],
+        detected_language=payload["language"],
+        audio_duration_sec=payload["audio_duration_sec"],
+        # A cache hit was stored under the configured model, see _transcribe_upload
+        whisper_model=result.model_key[0] if result else cfg["whisper_model"],
+        ollama_model=cmd.model,
+        generated_command=cmd.command,
+        user_action="remote",
+        edited_command=None,
+        execution_output=None,
+        execution_exit_code=None,
+        latency_stt_ms=result.latency_ms if result else 0,  # no decode on a cache hit
+        latency_llm_ms=cmd.latency_ms,
+        stt_cold_start=result.cold_start if result else False,
+        stt_model_wait_ms=result.model_wait_ms if result else 0,
+        audio_trimmed_sec=payload.get("trimmed_sec", 0.0),
+        stt_cache_hit=result is None,
+        llm_cold_start=cmd.cold_start,
+    )
+    log.info("[command] %s -> %s", payload["text"][:60], cmd.command[:80])
+
+    resp = jsonify({
+        **response,
+        "command": cmd.command,
+        "model": cmd.model,
+        "timings": {
+            "stt_ms": int((t_stt - t0) * 1000),
+            "stt_decode_ms": result.latency_ms if result else 0,
+            "llm_ms": int((t_llm - t_stt) * 1000),
+            "total_ms": int((t_llm - t0) * 1000),
+        },
+    })
+    if cache_status:
+        resp.headers["X-Cache"] = cache_status
+    _set_timing_headers(resp, result)
+    return resp
+
+
+def _transcribe_upload(
+    audio_file,
+    language: str | None,
+    task: str,
+) -> tuple[dict, TranscriptionResult | None, str | None]:
+    """STT for an uploaded file: result cache, then worker pool or in-process model.
+
+    Returns (payload, result, cache_status); `result` is None on a cache hit.
+    A "Cache-Control: no-cache" request skips the lookup but still stores.
+    Raises WorkerUnavailable if the pool lost the worker decoding it.
+    """
+    cfg = load_config()
+    cache = get_cache()
+    key = None
+    if cache is not None:
+        with span("cache.lookup"):
+            key = cache_key(
+                audio_file.stream,
+                language=language,
+                task=task,
+                model=cfg["whisper_model"],
+                compute_type=cfg["whisper_compute_type"],
+                initial_prompt=cfg["whisper_initial_prompt"],
+                preprocess=cfg["preprocess_enabled"],
+            )
+            no_cache = "no-cache" in request.headers.get("Cache-Control", "")
+            cached = None if no_cache else cache.get(key)
+        if cached is not None:
+            return cached, None, "HIT"
+
+    with span("http.save_upload"):
+        tmp_path = _save_upload(audio_file)
+    try:
+        if _pool is not None:
+            result = _pool.transcribe_file(tmp_path, language=language, task=task)
+        else:
+            result = transcribe_file(tmp_path, language=language, task=task)
+    finally:
+        _safe_delete(tmp_path)
+
+    payload = {
+        "text": result.text,
+        "language": result.language,
+        "audio_duration_sec": result.audio_duration_sec,
+        "latency_ms": result.latency_ms,
+        "trimmed_sec": result.trimmed_sec,
+    }
+    # Mid hot-swap the old model may still have decoded this; don't file it under the new one
+    configured = (cfg["whisper_model"], cfg["whisper_device"], cfg["whisper_compute_type"])
+    if cache is not None and result.model_key == configured:
+        cache.put(key, payload)
+    return payload, result, "MISS" if cache else None
+
+
+def _asr_response(
+    payload: dict,
+    output_format: str,
+    cache_status: str | None = None,
+    result: TranscriptionResult | None = None,
+) -> Response:
     if output_format == "json":
-        return jsonify({
-            "text": result.text,
-            "language": result.language,
-            "audio_duration_sec": result.audio_duration_sec,
-            "latency_ms": result.latency_ms,
-        })
+        resp = jsonify(payload)
+    else:
+        resp = Response(payload["text"], mimetype="text/plain")
+    if cache_status:
+        resp.headers["X-Cache"] = cache_status
+    _set_timing_headers(resp, result)
+    return resp
+
+
+def _set_timing_headers(resp: Response, result: TranscriptionResult | None) -> None:
+    """X-Queue-Ms: wait behind other decodes; X-Stt-Ms: the decode itself. Used by `loadtest`."""
+    if result is None:
+        return
+    resp.headers["X-Queue-Ms"] = str(result.queue_ms)
+    resp.headers["X-Stt-Ms"] = str(result.latency_ms)
+
+
+@sock.route("/stream")
+def stream(ws):
+    """Live dictation over WebSocket.
+
+    The client connects to /stream?language=es&encoding=pcm_s16le and sends
+    binary messages of 16 kHz mono PCM (pcm_s16le or f32le) while recording,
+    then the text message "EOF". The server pushes JSON messages:
+      {"type": "ready"}
+      {"type": "partial", "text": ..., "start": ..., "end": ...}
+      {"type": "final", "text": ..., "start": ..., "end": ...}
+      {"type": "done"} or {"type": "error", "message": ...}
+    """
+    language = request.args.get("language", None)
+    encoding = request.args.get("encoding", "pcm_s16le")
 
-    return Response(result.text, mimetype="text/plain")
+    try:
+        sample_rate = int(request.args.get("sample_rate", 16000))
+    except ValueError:
+        ws.send(json.dumps({"type": "error", "message": "Invalid sample_rate"}))
+        return
+    if sample_rate != 16000:
+        ws.send(json.dumps({"type": "error", "message": "Only 16000 Hz audio is supported"}))
+        return
+
+    prefetch()
+    try:
+        with open_session(language=language, encoding=encoding) as session:
+            ws.send(json.dumps({"type": "ready"}))
+            while True:
+                message = ws.receive()
+                if isinstance(message, str):
+                    if message.strip().upper() == "EOF":
+                        break
+                    continue
+                for event in session.feed(message):
+                    _send_stream_event(ws, event)
+            for event in session.finish():
+                _send_stream_event(ws, event)
+    except (RuntimeError, ValueError) as e:
+        ws.send(json.dumps({"type": "error", "message": str(e)}))
+        return
+
+    ws.send(json.dumps({"type": "done"}))
+
+
+def _send_stream_event(ws, event: dict) -> None:
+    ws.send(json.dumps(event, ensure_ascii=False))
+    if event["type"] != "final":
+        return
+    log_text(
+        transcription=event["text"],
+        detected_language=event["language"],
+        audio_duration_sec=round(event["end"] - event["start"], 2),
+        whisper_model=event["model"],
+        latency_stt_ms=event["latency_ms"],
+        stt_cold_start=event["cold_start"],
+        stt_model_wait_ms=event["model_wait_ms"],
+    )
+    log.info("[stream] %s (%dms)", event["text"][:80], event["latency_ms"])
+
+
+def _stream_response(
+    tmp_path: str,
+    output_format: str,
+    language: str | None,
+    task: str,
+    word_timestamps: bool,
+) -> Response:
+    """Stream segments in a subtitle/segment format as they are decoded."""
+    info = StreamInfo()
+    writer = WRITERS[output_format]
+    # The body is produced after the request context is gone; carry the trace along
+    trace = tracing.detach()
+
+    def _generate():
+        tracing.attach(trace)
+        try:
+            segments = stream_file(
+                tmp_path,
+                info,
+                language=language,
+                task=task,
+                word_timestamps=word_timestamps,
+            )
+            yield from writer(segments)
+        finally:
+            _safe_delete(tmp_path)
+
+        log_text(
+            transcription=info.text,
+            detected_language=info.language,
+            audio_duration_sec=info.audio_duration_sec,
+            whisper_model=info.model_key[0],
+            latency_stt_ms=info.latency_ms,
+            stt_cold_start=info.cold_start,
+            stt_model_wait_ms=info.model_wait_ms,
+            audio_trimmed_sec=info.trimmed_sec,
+        )
+        log.info(
+            "[asr/%s] %s (%s, %.1fs audio, %dms)",
+            output_format,
+            info.text[:80],
+            info.language,
+            info.audio_duration_sec,
+            info.latency_ms,
+        )
+        tracing.finish(trace)
+
+    return Response(
+        _generate(),
+        mimetype=MIMETYPES[output_format],
+    )
 
 
 # ── Helpers ────────────────────────────────────────────────────
 
 
+def _is_admin() -> bool:
+    token = load_config().get("http_admin_token")
+    if token:
+        return request.headers.get("Authorization", "") == f"Bearer {token}"
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+
 def _guess_suffix(filename: str) -> str:
     if "." in filename:
         return "." + filename.rsplit(".", 1)[-1]
     return ".m4a"
 
 
+def _save_upload(audio_file) -> str:
+    """Write an uploaded file to the tmp dir and return its path."""
+    suffix = _guess_suffix(audio_file.filename or "audio.m4a")
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=_get_tmp_dir()) as tmp:
+        audio_file.save(tmp)
+        return tmp.name
+
+
 def _get_tmp_dir() -> str:
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     tmp_dir = os.path.join(base, "tmp")
@@ -116,6 +491,7 @@ def start_server(cfg: dict) -> threading.Thread:
     max_mb = cfg.get("http_max_content_mb", 25)
 
     app.config["MAX_CONTENT_LENGTH"] = max_mb * 1024 * 1024
+    tracing.configure(cfg)
 
     # Suppress Flask/Werkzeug startup banner and per-request logs
     werkzeug_log = logging.getLogger("werkzeug")
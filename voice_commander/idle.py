@@ -0,0 +1,40 @@
+"""Idle eviction of the Whisper and Ollama models.
+
+After `idle_unload_sec` without use, the Whisper model is dropped and the
+Ollama model is unloaded with keep_alive=0. Both are reloaded on demand;
+callers use transcriber.prefetch() / commander.prefetch() to start the
+reload as early as possible (hotkey press, request arrival).
+"""
+
+import logging
+import threading
+import time
+
+from . import commander, transcriber
+from .config import load_config
+
+log = logging.getLogger("voice_commander.idle")
+
+
+def start_idle_reaper() -> threading.Thread | None:
+    """Start the background eviction thread. Returns None when disabled."""
+    cfg = load_config()
+    idle_sec = cfg["idle_unload_sec"]
+    if not idle_sec:
+        return None
+    interval = min(30.0, idle_sec / 4)
+
+    def _run():
+        while True:
+            time.sleep(interval)
+            if transcriber.is_loaded() and transcriber.idle_seconds() >= idle_sec:
+                if transcriber.unload():
+                    log.info("Whisper model unloaded after %.0fs idle", idle_sec)
+            llm_idle = commander.idle_seconds()
+            if llm_idle is not None and llm_idle >= idle_sec:
+                if commander.unload_model():
+                    log.info("Ollama model unloaded after %.0fs idle", idle_sec)
+
+    thread = threading.Thread(target=_run, daemon=True, name="idle-reaper")
+    thread.start()
+    return thread
@@ -0,0 +1,176 @@
+"""Always-listening capture: a persistent input stream behind an energy gate.
+
+The sounddevice callback only queues blocks; the consuming thread runs the
+NumPy EnergyVAD over each block (one vectorized RMS per `listen_block_ms`),
+so while the room is quiet the process wakes ~10 times a second and does no
+model work. Only utterances that pass the gate and are at least
+`listen_min_speech_ms` long are returned for transcription.
+
+What the user said decides what happens next: an optional wake word, then a
+mode prefix ("comando ..." / "texto ..."), see parse_utterance().
+"""
+
+import queue
+import re
+import time
+import unicodedata
+from collections import deque
+from difflib import SequenceMatcher
+from typing import Callable
+
+import numpy as np
+import sounddevice as sd
+
+from .config import load_config
+from .recorder import Recording
+from .vad import EnergyVAD
+
+_MATCH_RATIO = 0.8  # fuzzy match for wake word / prefix (Whisper spelling varies)
+
+
+class Listener:
+    """Gated always-on recorder; the always-listening counterpart of Recorder."""
+
+    def __init__(self, on_start: Callable[[str], None] | None = None):
+        cfg = load_config()
+        self._on_start = on_start
+        self.sample_rate = cfg["sample_rate"]
+        self.channels = cfg["channels"]
+        self.block_len = self.sample_rate * cfg["listen_block_ms"] // 1000
+        self.silence_sec = cfg["listen_silence_ms"] / 1000
+        self.min_speech_sec = cfg["listen_min_speech_ms"] / 1000
+        self.max_utterance_sec = cfg["listen_max_utterance_sec"]
+        self.preroll_blocks = max(1, cfg["listen_preroll_ms"] // cfg["listen_block_ms"])
+        self._vad = EnergyVAD(
+            self.sample_rate,
+            threshold_db=cfg["vad_threshold_db"],
+            hangover_ms=cfg["listen_silence_ms"],
+        )
+
+        self._blocks: queue.Queue = queue.Queue()
+        self._listening = False
+        self._stream: sd.InputStream | None = None
+        self._idle_wall = 0.0
+        self._idle_cpu = 0.0
+        self.rejected = 0  # gate openings too short to transcribe
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        if self._listening:
+            self._blocks.put((time.perf_counter_ns(), indata[:, 0].copy()))
+
+    def start(self) -> None:
+        """Open the input stream; it stays open across utterances."""
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype="float32",
+            blocksize=self.block_len,
+            callback=self._audio_callback,
+        )
+        self._stream.start()
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def idle_cpu_percent(self) -> float:
+        """Process CPU time while waiting for speech, as % of one core."""
+        return 100 * self._idle_cpu / self._idle_wall if self._idle_wall else 0.0
+
+    def wait_for_utterance(self) -> Recording:
+        """Block until a gated utterance ends. Audio heard while not waiting is dropped.
+
+        Returns:
+            Recording with mode "" (decided later from the transcript).
+        """
+        self._vad.reset()
+        while not self._blocks.empty():
+            self._blocks.get_nowait()
+        preroll: deque = deque(maxlen=self.preroll_blocks)
+        self._listening = True
+        try:
+            while True:
+                wall0, cpu0 = time.perf_counter(), time.process_time()
+                start_ns, blocks = self._wait_for_speech(preroll)
+                self._idle_wall += time.perf_counter() - wall0
+                self._idle_cpu += time.process_time() - cpu0
+
+                if self._on_start is not None:
+                    self._on_start("listen")
+                n_preroll = len(blocks) - 1  # the last block is where speech started
+                end_ns = self._collect_speech(blocks)
+                audio = np.concatenate(blocks)
+                speech_sec = (len(blocks) - n_preroll) * self.block_len / self.sample_rate - self.silence_sec
+                if speech_sec >= self.min_speech_sec:
+                    return Recording(
+                        audio=audio,
+                        mode="",
+                        sample_rate=self.sample_rate,
+                        pressed_ns=start_ns,
+                        first_frame_ns=start_ns,
+                        released_ns=end_ns,
+                    )
+                self.rejected += 1
+                self._vad.reset()
+                preroll.clear()
+        finally:
+            self._listening = False
+
+    def _next_block(self) -> tuple[int, np.ndarray]:
+        while True:
+            try:
+                return self._blocks.get(timeout=1.0)  # timeout keeps Ctrl+C responsive on Windows
+            except queue.Empty:
+                continue
+
+    def _wait_for_speech(self, preroll: deque) -> tuple[int, list[np.ndarray]]:
+        while True:
+            ts_ns, block = self._next_block()
+            preroll.append(block)
+            if "start" in self._vad.process(block):
+                return ts_ns, list(preroll)
+
+    def _collect_speech(self, blocks: list[np.ndarray]) -> int:
+        max_blocks = int(self.max_utterance_sec * self.sample_rate / self.block_len)
+        while True:
+            ts_ns, block = self._next_block()
+            blocks.append(block)
+            if "end" in self._vad.process(block) or len(blocks) >= max_blocks:
+                return ts_ns
+
+
+def _normalize(word: str) -> str:
+    word = unicodedata.normalize("NFKD", word.lower())
+    word = "".join(c for c in word if not unicodedata.combining(c))
+    return re.sub(r"[^\w]", "", word)
+
+
+def _matches(word: str, target: str) -> bool:
+    return SequenceMatcher(None, _normalize(word), target).ratio() >= _MATCH_RATIO
+
+
+def has_wake_word(text: str, wake_word: str | None) -> bool:
+    """True if `text` starts with `wake_word` (or no wake word is configured)."""
+    if not wake_word:
+        return True
+    words = text.split()
+    targets = [_normalize(w) for w in wake_word.split()]
+    return len(words) >= len(targets) and all(_matches(w, t) for w, t in zip(words, targets))
+
+
+def parse_utterance(text: str, wake_word: str | None, prefixes: dict[str, str]) -> tuple[str | None, str]:
+    """Split "<wake word> <prefix> <rest>" into (mode, rest).
+
+    mode is None if the wake word or a known prefix is missing.
+    """
+    if not has_wake_word(text, wake_word):
+        return None, text
+    words = text.split()[len(wake_word.split()) if wake_word else 0:]
+    if not words:
+        return None, ""
+    for prefix, mode in prefixes.items():
+        if _matches(words[0], _normalize(prefix)):
+            return mode, " ".join(words[1:]).lstrip(" ,.:;-")
+    return None, " ".join(words)
@@ -0,0 +1,251 @@
+"""Routing of Ollama requests across several backends.
+
+Each request goes to the healthy backend with the fewest outstanding
+requests. Generation is streamed so time-to-first-token (TTFT) can be
+observed: if the chosen backend has produced no token by the hedge deadline
+(p95 of recent TTFTs, floored at `ollama_hedge_min_ms`), the same request
+is also sent to another backend and whichever finishes first wins. A
+backend that fails to connect is taken out of rotation for a cooldown and
+re-probed in the background.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import requests
+
+from .config import load_config
+
+log = logging.getLogger("voice_commander.llm")
+
+_TTFT_WINDOW = 200
+_MIN_TTFT_SAMPLES = 20
+
+
+class LLMError(RuntimeError):
+    """Every backend failed. `connection` is True if none could be reached."""
+
+    def __init__(self, message: str, connection: bool):
+        super().__init__(message)
+        self.connection = connection
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.down_until = 0.0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, cooldown: float) -> None:
+        self.failures += 1
+        self.down_until = time.monotonic() + cooldown
+
+    def mark_up(self) -> None:
+        self.failures = 0
+        self.down_until = 0.0
+
+
+class Router:
+    def __init__(self, urls: list[str], cfg: dict):
+        self.backends = [Backend(u) for u in urls]
+        self.timeout = cfg["ollama_timeout"]
+        self.hedge_min_s = cfg["ollama_hedge_min_ms"] / 1000
+        self.hedge_default_s = cfg["ollama_hedge_default_ms"] / 1000
+        self.cooldown = cfg["ollama_backend_cooldown_sec"]
+        self._ttft: deque[float] = deque(maxlen=_TTFT_WINDOW)
+        self._lock = threading.Lock()
+        threading.Thread(
+            target=self._health_loop,
+            args=(cfg["ollama_health_interval_sec"],),
+            daemon=True,
+            name="llm-health",
+        ).start()
+
+    # ── Selection ─────────────────────────────────────────────
+
+    def pick(self, exclude: list[Backend] = (), reserve: bool = False) -> Backend | None:
+        """Least-outstanding healthy backend; falls back to unhealthy ones.
+
+        With `reserve`, the backend's outstanding count is incremented under
+        the same lock so concurrent picks spread out.
+        """
+        with self._lock:
+            candidates = [b for b in self.backends if b not in exclude]
+            if not candidates:
+                return None
+            healthy = [b for b in candidates if b.healthy] or candidates
+            backend = min(healthy, key=lambda b: b.outstanding)
+            if reserve:
+                backend.outstanding += 1
+            return backend
+
+    def hedge_deadline(self) -> float:
+        with self._lock:
+            if len(self._ttft) < _MIN_TTFT_SAMPLES:
+                return self.hedge_default_s
+            p95 = float(np.percentile(np.fromiter(self._ttft, dtype=float), 95))
+        return max(self.hedge_min_s, p95)
+
+    def stats(self) -> list[dict]:
+        return [
+            {"url": b.url, "healthy": b.healthy, "outstanding": b.outstanding, "failures": b.failures}
+            for b in self.backends
+        ]
+
+    # ── Generation ────────────────────────────────────────────
+
+    def generate(self, payload: dict) -> tuple[str, Backend, int]:
+        """Run one generation with hedging/failover. Returns (text, winning backend, attempts)."""
+        events: queue.Queue = queue.Queue()
+        cancel = threading.Event()
+        tried: list[Backend] = []
+        running = 0
+        first_token = False
+        hedged = False
+        errors: list[Exception] = []
+
+        def launch() -> bool:
+            nonlocal running
+            backend = self.pick(exclude=tried, reserve=True)
+            if backend is None:
+                return False
+            tried.append(backend)
+            running += 1
+            threading.Thread(
+                target=self._attempt,
+                args=(backend, payload, events, cancel),
+                daemon=True,
+                name="llm-attempt",
+            ).start()
+            return True
+
+        launch()
+        start = time.monotonic()
+        hedge_at = start + self.hedge_deadline()
+        give_up_at = start + self.timeout  # total budget, however slowly tokens trickle in
+        try:
+            while running:
+                now = time.monotonic()
+                if now >= give_up_at:
+                    errors.append(requests.Timeout(f"no complete response within {self.timeout}s"))
+                    break
+                wait_until = give_up_at if (first_token or hedged) else min(hedge_at, give_up_at)
+                try:
+                    kind, backend, value = events.get(timeout=max(0.0, wait_until - now))
+                except queue.Empty:
+                    if first_token or hedged or time.monotonic() >= give_up_at:
+                        continue  # total deadline reached; handled at the top of the loop
+                    hedged = True  # hedge at most once per request
+                    if launch():
+                        log.info("No token from %s after deadline; hedging to %s", tried[0].url, tried[-1].url)
+                    continue
+
+                if kind == "token":
+                    first_token = True
+                elif kind == "done":
+                    return value, backend, len(tried)
+                else:
+                    running -= 1
+                    errors.append(value)
+                    if running == 0:
+                        launch()  # fail over to the next backend, if any
+        finally:
+            cancel.set()
+
+        # A timeout means the backend was reachable but slow; only refused/failed connects count
+        connection = all(isinstance(e, requests.ConnectionError) for e in errors)
+        raise LLMError(f"All LLM backends failed: {errors[-1] if errors else 'no backends'}", connection)
+
+    def _attempt(self, backend: Backend, payload: dict, events: queue.Queue, cancel: threading.Event) -> None:
+        """One streamed request; `backend.outstanding` was reserved by pick()."""
+        t0 = time.perf_counter()
+        got_token = False
+        parts = []
+        try:
+            with requests.post(
+                f"{backend.url}/api/generate",
+                json={**payload, "stream": True},
+                timeout=(5, self.timeout),
+                stream=True,
+            ) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if cancel.is_set():
+                        raise _Cancelled()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise requests.HTTPError(chunk["error"])
+                    text = chunk.get("response", "")
+                    if text and not got_token:
+                        got_token = True
+                        with self._lock:
+                            self._ttft.append(time.perf_counter() - t0)
+                        events.put(("token", backend, None))
+                    parts.append(text)
+                    if chunk.get("done"):
+                        break
+            backend.mark_up()
+            events.put(("done", backend, "".join(parts)))
+        except _Cancelled:
+            pass
+        except (requests.RequestException, ValueError) as e:
+            if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                backend.mark_down(self.cooldown)
+            events.put(("error", backend, e))
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    # ── Health checks ─────────────────────────────────────────
+
+    def _health_loop(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            if _router is not self:
+                return  # replaced after a config change
+            for backend in self.backends:
+                if backend.healthy:
+                    continue
+                try:
+                    requests.get(f"{backend.url}/api/tags", timeout=2).raise_for_status()
+                except requests.RequestException:
+                    continue
+                log.info("LLM backend %s is back", backend.url)
+                backend.mark_up()
+
+
+_router: Router | None = None
+_router_urls: list[str] = []
+_router_lock = threading.Lock()
+
+
+def backend_urls(cfg: dict) -> list[str]:
+    return list(cfg["ollama_backends"]) or [cfg["ollama_url"]]
+
+
+def get_router() -> Router:
+    """Process-wide router, rebuilt if the configured backend list changes."""
+    global _router, _router_urls
+    cfg = load_config()
+    urls = backend_urls(cfg)
+    with _router_lock:
+        if _router is None or urls != _router_urls:
+            _router = Router(urls, cfg)
+            _router_urls = urls
+        return _router
@@ -0,0 +1,261 @@
+"""`voice-commander loadtest`: replay audio fixtures against a running server.
+
+Closed loop (default): `--concurrency` clients each send their next request
+as soon as the previous one completes, so offered load adapts to the server.
+
+Open loop (`--rate R`): requests are issued R times per second whatever the
+server does, with at most `--concurrency` in flight. Latency is measured
+from each request's scheduled send time, so time spent waiting for a free
+client counts against the server instead of being hidden (no coordinated
+omission).
+
+Queue and decode time come from the X-Queue-Ms / X-Stt-Ms response headers.
+Requests send "Cache-Control: no-cache" so repeated fixtures are decoded
+every time; pass --allow-cache to measure the cached path. To load only the
+server machinery, start it with `voice-commander serve --fake-model`.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+import requests
+
+AUDIO_EXTENSIONS = (".wav", ".m4a", ".ogg", ".opus", ".mp3", ".flac", ".webm")
+
+
+@dataclass
+class Sample:
+    fixture: str
+    scheduled: float  # perf_counter() at which the request was due
+    finished: float
+    status: int | None  # None if no response was received
+    error: str | None  # "timeout", "connection" or "http"
+    queue_ms: float = np.nan
+    stt_ms: float = np.nan
+    cache: str = ""
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.finished - self.scheduled) * 1000
+
+
+def load_fixtures(paths: list[str]) -> list[tuple[str, bytes]]:
+    """Read audio files (directories are expanded, non-recursively) into memory."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(AUDIO_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    fixtures = []
+    for path in files:
+        with open(path, "rb") as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    if not fixtures:
+        raise ValueError("No audio fixtures found")
+    return fixtures
+
+
+def _header_ms(resp: requests.Response, name: str) -> float:
+    try:
+        return float(resp.headers[name])
+    except (KeyError, ValueError):
+        return np.nan
+
+
+def _send(
+    session: requests.Session,
+    url: str,
+    fixture: tuple[str, bytes],
+    scheduled: float,
+    timeout: float,
+    headers: dict,
+) -> Sample:
+    name, data = fixture
+    try:
+        resp = session.post(url, files={"audio_file": (name, data)}, headers=headers, timeout=timeout)
+    except requests.Timeout:
+        return Sample(name, scheduled, time.perf_counter(), None, "timeout")
+    except requests.RequestException:
+        return Sample(name, scheduled, time.perf_counter(), None, "connection")
+    return Sample(
+        name,
+        scheduled,
+        time.perf_counter(),
+        resp.status_code,
+        None if resp.ok else "http",
+        queue_ms=_header_ms(resp, "X-Queue-Ms"),
+        stt_ms=_header_ms(resp, "X-Stt-Ms"),
+        cache=resp.headers.get("X-Cache", ""),
+    )
+
+
+def run(
+    url: str,
+    fixtures: list[tuple[str, bytes]],
+    concurrency: int = 4,
+    rate: float | None = None,
+    duration: float | None = 30.0,
+    total: int | None = None,
+    timeout: float = 60.0,
+    poisson: bool = False,
+    allow_cache: bool = False,
+) -> tuple[list[Sample], float]:
+    """Generate load until `duration` seconds or `total` requests. Returns (samples, wall seconds)."""
+    headers = {} if allow_cache else {"Cache-Control": "no-cache"}
+    local = threading.local()
+    samples: list[Sample] = []
+    samples_lock = threading.Lock()
+    t0 = time.perf_counter()
+    deadline = t0 + duration if duration else float("inf")
+
+    def more(i: int, now: float) -> bool:
+        return (total is None or i < total) and now < deadline
+
+    def send(i: int, scheduled: float) -> None:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        sample = _send(local.session, url, fixtures[i % len(fixtures)], scheduled, timeout, headers)
+        with samples_lock:
+            samples.append(sample)
+
+    if rate is None:
+        counter = itertools.count()
+
+        def client() -> None:
+            while True:
+                i = next(counter)  # atomic under the GIL
+                now = time.perf_counter()
+                if not more(i, now):
+                    return
+                send(i, now)
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            scheduled = t0
+            for i in itertools.count():
+                if not more(i, scheduled):
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(send, i, scheduled))
+                scheduled += random.expovariate(rate) if poisson else 1 / rate
+            wait(futures)
+
+    return samples, time.perf_counter() - t0
+
+
+def _percentiles(values: np.ndarray, percentiles: tuple[float, ...]) -> dict:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {}
+    out = {f"p{p:g}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+    out["max"] = float(values.max())
+    return out
+
+
+def summarize(samples: list[Sample], wall_sec: float, percentiles: tuple[float, ...] = (50, 90, 99)) -> dict:
+    ok = [s for s in samples if s.error is None]
+    statuses: dict[str, int] = {}
+    for s in samples:
+        key = str(s.status) if s.status is not None else s.error
+        statuses[key] = statuses.get(key, 0) + 1
+    n = len(samples)
+    return {
+        "requests": n,
+        "ok": len(ok),
+        "error_rate": (n - len(ok)) / n if n else 0.0,
+        "timeout_rate": sum(s.error == "timeout" for s in samples) / n if n else 0.0,
+        "throughput_rps": len(ok) / wall_sec if wall_sec else 0.0,
+        "wall_sec": wall_sec,
+        "statuses": statuses,
+        "cache_hits": sum(s.cache == "HIT" for s in ok),
+        "latency_ms": _percentiles(np.array([s.latency_ms for s in ok]), percentiles),
+        "queue_ms": _percentiles(np.array([s.queue_ms for s in ok]), percentiles),
+        "stt_ms": _percentiles(np.array([s.stt_ms for s in ok]), percentiles),
+    }
+
+
+def _print_report(report: dict, args: argparse.Namespace) -> None:
+    mode = f"open loop, {args.rate:g} req/s" if args.rate else "closed loop"
+    print(f"{args.url}{args.endpoint}  ({mode}, concurrency {args.concurrency})")
+    print(
+        f"  {report['requests']} requests in {report['wall_sec']:.1f}s: "
+        f"{report['throughput_rps']:.2f} ok/s, "
+        f"errors {report['error_rate']:.1%}, timeouts {report['timeout_rate']:.1%}"
+    )
+    print(f"  statuses: {', '.join(f'{k}={v}' for k, v in sorted(report['statuses'].items()))}")
+    if report["cache_hits"]:
+        print(f"  cache hits: {report['cache_hits']}")
+    for label, key in (("latency", "latency_ms"), ("queue", "queue_ms"), ("stt", "stt_ms")):
+        stats = report[key]
+        if stats:
+            print(f"  {label:<8} " + "  ".join(f"{k} {v:>7.0f}ms" for k, v in stats.items()))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="voice-commander loadtest", description="Load-test a running ASR server")
+    parser.add_argument("fixtures", nargs="+", help="audio files or directories to replay (round-robin)")
+    parser.add_argument("--url", default="http://localhost:9090")
+    parser.add_argument("--endpoint", default="/asr", help="/asr or /command")
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--concurrency", type=int, default=4, help="clients (closed loop) or max in flight (open loop)")
+    parser.add_argument("--rate", type=float, default=None, help="requests/second; enables open-loop mode")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times in open loop")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run (default 30)")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--allow-cache", action="store_true", help="let the server answer from its result cache")
+    parser.add_argument("--percentiles", default="50,90,99")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a report")
+    args = parser.parse_args(argv)
+
+    duration = args.duration if args.duration or args.requests else 30.0
+    params = "?output=json" if args.endpoint == "/asr" else "?"
+    if args.language:
+        params += f"&language={args.language}"
+    url = f"{args.url.rstrip('/')}{args.endpoint}{params}"
+
+    fixtures = load_fixtures(args.fixtures)
+    samples, wall = run(
+        url,
+        fixtures,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        duration=duration,
+        total=args.requests,
+        timeout=args.timeout,
+        poisson=args.poisson,
+        allow_cache=args.allow_cache,
+    )
+    percentiles = tuple(float(p) for p in args.percentiles.split(","))
+    report = summarize(samples, wall, percentiles)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    _print_report(report, args)
+
+
+if __name__ == "__main__":
+    main()
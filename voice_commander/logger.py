@@ -7,6 +7,7 @@ import uuid
 from datetime import datetime, timezone
 
 from .config import load_config
+from .tracing import span
 
 _lock = threading.Lock()
 
@@ -37,6 +38,11 @@ def log_command(
     execution_exit_code: int | None,
     latency_stt_ms: int,
     latency_llm_ms: int,
+    stt_cold_start: bool = False,
+    stt_model_wait_ms: int = 0,
+    audio_trimmed_sec: float = 0.0,
+    stt_cache_hit: bool = False,
+    llm_cold_start: bool = False,
 ) -> None:
     """Log a command-mode interaction."""
     entry = {
@@ -55,6 +61,11 @@ def log_command(
         "execution_exit_code": execution_exit_code,
         "latency_stt_ms": latency_stt_ms,
         "latency_llm_ms": latency_llm_ms,
+        "stt_cold_start": stt_cold_start,
+        "stt_model_wait_ms": stt_model_wait_ms,
+        "audio_trimmed_sec": audio_trimmed_sec,
+        "stt_cache_hit": stt_cache_hit,
+        "llm_cold_start": llm_cold_start,
     }
     _write(entry)
 
@@ -65,6 +76,9 @@ def log_text(
     audio_duration_sec: float,
     whisper_model: str,
     latency_stt_ms: int,
+    stt_cold_start: bool = False,
+    stt_model_wait_ms: int = 0,
+    audio_trimmed_sec: float = 0.0,
 ) -> None:
     """Log a text-mode interaction."""
     entry = {
@@ -76,12 +90,16 @@ def log_text(
         "transcription": transcription,
         "detected_language": detected_language,
         "latency_stt_ms": latency_stt_ms,
+        "stt_cold_start": stt_cold_start,
+        "stt_model_wait_ms": stt_model_wait_ms,
+        "audio_trimmed_sec": audio_trimmed_sec,
     }
     _write(entry)
 
 
 def _write(entry: dict) -> None:
-    path = _get_log_path()
-    with _lock:
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    with span("log.write"):
+        path = _get_log_path()
+        with _lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
@@ -4,6 +4,7 @@ import io
 import os
 import sys
 import threading
+from dataclasses import replace
 from datetime import datetime
 
 import pyperclip
@@ -11,10 +12,14 @@ from colorama import Fore, Style, init as colorama_init
 
 from .recorder import Recorder
 from .transcriber import transcribe, warmup, spinner
+from . import commander, tracing, transcriber
 from .commander import generate_command
 from .executor import run_command
 from .logger import log_command, log_text
-from .config import load_config
+from .config import load_config, watch_config
+from .idle import start_idle_reaper
+from .listener import Listener, has_wake_word, parse_utterance
+from .tracing import span
 
 # ── UI helpers ──────────────────────────────────────────────────
 
@@ -50,7 +55,7 @@ def _clear_line():
         sys.stdout.flush()
 
 
-def _print_banner(cfg: dict):
+def _print_banner(cfg: dict, listen: bool = False):
     w = 52
     print()
     print(f"{CYN}{'~' * w}{R}")
@@ -62,8 +67,13 @@ def _print_banner(cfg: dict):
     if cfg.get("http_enabled"):
         print(f"  {DIM}HTTP{R} :{cfg['http_port']}  {DIM}(remote STT){R}")
     print()
-    print(f"  {B}Ctrl+Alt+V{R}  {DIM}comando{R}   voz -> terminal")
-    print(f"  {B}Ctrl+Alt+T{R}  {DIM}texto{R}     voz -> clipboard")
+    if listen:
+        wake = f"{cfg['listen_wake_word']} " if cfg["listen_wake_word"] else ""
+        print(f"  {B}\"{wake}comando ...\"{R}  {DIM}voz -> terminal{R}")
+        print(f"  {B}\"{wake}texto ...\"{R}    {DIM}voz -> clipboard{R}")
+    else:
+        print(f"  {B}Ctrl+Alt+V{R}  {DIM}comando{R}   voz -> terminal")
+        print(f"  {B}Ctrl+Alt+T{R}  {DIM}texto{R}     voz -> clipboard")
     print(f"  {B}Ctrl+C{R}      {DIM}salir{R}")
     print()
 
@@ -72,31 +82,62 @@ def _waiting():
     print(f"\n{CYN}  >{R} {DIM}Esperando...{R}  {DIM}(manten hotkey mientras hablas){R}\n")
 
 
+def _listening(listener: Listener):
+    cpu = listener.idle_cpu_percent()
+    print(f"\n{CYN}  >{R} {DIM}Escuchando...{R}  {DIM}(CPU en reposo {cpu:.1f}%){R}\n")
+
+
 def _section(label: str):
     print(f"\n{DIM}{'- ' * 26}{R}")
     print(f"  {CYN}{label}{R}")
 
 
-# ── Command mode ────────────────────────────────────────────────
+def _stt_stats(stt) -> str:
+    line = f"{stt.language} | {stt.latency_ms}ms | {stt.audio_duration_sec}s audio"
+    if stt.cold_start:
+        line += f" | cold start +{stt.model_wait_ms}ms"
+    if stt.trimmed_sec:
+        line += f" | {stt.trimmed_sec}s silence trimmed"
+    return line
 
-def _handle_command_mode(rec):
-    """Process a command-mode recording: transcribe -> LLM -> CLI menu."""
-    _section("Modo Comando")
 
-    # STT
+def _prefetch(mode: str):
+    """Hotkey pressed: start reloading evicted models while the user speaks."""
+    transcriber.prefetch()
+    if mode == "command":
+        commander.prefetch()
+
+
+# ── Command mode ────────────────────────────────────────────────
+
+def _transcribe(rec):
     stop = threading.Event()
     t = threading.Thread(target=spinner, args=("Transcribiendo...", stop), daemon=True)
     t.start()
-    stt = transcribe(rec.audio, rec.sample_rate)
-    stop.set()
-    t.join()
+    try:
+        return transcribe(rec.audio, rec.sample_rate)
+    finally:
+        stop.set()
+        t.join()
+
+
+def _handle_command_mode(rec, stt=None):
+    """Process a command-mode recording: transcribe -> LLM -> CLI menu.
+
+    `stt` is passed when the recording was already transcribed (listen mode).
+    """
+    _section("Modo Comando")
+
+    # STT
+    if stt is None:
+        stt = _transcribe(rec)
 
     if not stt.text:
         _replace_line(f"  {RED}! No se detecto voz.{R}")
         return
 
     _replace_line(f"  {GRN}*{R} {B}{stt.text}{R}")
-    print(f"    {DIM}{stt.language} | {stt.latency_ms}ms | {stt.audio_duration_sec}s audio{R}")
+    print(f"    {DIM}{_stt_stats(stt)}{R}")
 
     # LLM
     stop = threading.Event()
@@ -116,7 +157,7 @@ def _handle_command_mode(rec):
     _clear_line()
     print(f"\n  {DIM}comando:{R}")
     print(f"  {YLW}{B}{cmd.command}{R}")
-    print(f"    {DIM}{cmd.latency_ms}ms{R}")
+    print(f"    {DIM}{cmd.latency_ms}ms{' | cold start' if cmd.cold_start else ''}{R}")
 
     # CLI menu
     user_action = None
@@ -128,7 +169,8 @@ def _handle_command_mode(rec):
     while True:
         print()
         print(f"  {GRN}e{R} ejecutar  {CYN}c{R} copiar  {YLW}r{R} editar  {RED}x{R} cancelar")
-        choice = input(f"  {CYN}>{R} ").strip().lower()
+        with span("ui.menu_wait"):
+            choice = input(f"  {CYN}>{R} ").strip().lower()
 
         if choice == "e":
             user_action = "executed"
@@ -153,7 +195,8 @@ def _handle_command_mode(rec):
 
         elif choice == "c":
             user_action = "copied"
-            pyperclip.copy(final_command)
+            with span("ui.clipboard"):
+                pyperclip.copy(final_command)
             print(f"  {GRN}* Copiado al clipboard{R}")
             break
 
@@ -170,12 +213,11 @@ def _handle_command_mode(rec):
             print(f"  {DIM}cancelado{R}")
             break
 
-    cfg = load_config()
     log_command(
         transcription=stt.text,
         detected_language=stt.language,
         audio_duration_sec=stt.audio_duration_sec,
-        whisper_model=cfg["whisper_model"],
+        whisper_model=stt.model_key[0],
         ollama_model=cmd.model,
         generated_command=cmd.command,
         user_action=user_action or "cancelled",
@@ -184,43 +226,137 @@ def _handle_command_mode(rec):
         execution_exit_code=exec_code,
         latency_stt_ms=stt.latency_ms,
         latency_llm_ms=cmd.latency_ms,
+        stt_cold_start=stt.cold_start,
+        stt_model_wait_ms=stt.model_wait_ms,
+        audio_trimmed_sec=stt.trimmed_sec,
+        llm_cold_start=cmd.cold_start,
     )
 
 
 # ── Text mode ──────────────────────────────────────────────────
 
-def _handle_text_mode(rec):
+def _handle_text_mode(rec, stt=None):
     """Process a text-mode recording: transcribe -> clipboard."""
     _section("Modo Texto")
 
-    stop = threading.Event()
-    t = threading.Thread(target=spinner, args=("Transcribiendo...", stop), daemon=True)
-    t.start()
-    stt = transcribe(rec.audio, rec.sample_rate)
-    stop.set()
-    t.join()
+    if stt is None:
+        stt = _transcribe(rec)
 
     if not stt.text:
         _replace_line(f"  {RED}! No se detecto voz.{R}")
         return
 
-    pyperclip.copy(stt.text)
+    with span("ui.clipboard"):
+        pyperclip.copy(stt.text)
     _replace_line(f"  {GRN}* Copiado:{R} {B}{stt.text}{R}")
-    print(f"    {DIM}{stt.language} | {stt.latency_ms}ms | {stt.audio_duration_sec}s audio{R}")
+    print(f"    {DIM}{_stt_stats(stt)}{R}")
 
-    cfg = load_config()
     log_text(
         transcription=stt.text,
         detected_language=stt.language,
         audio_duration_sec=stt.audio_duration_sec,
-        whisper_model=cfg["whisper_model"],
+        whisper_model=stt.model_key[0],
         latency_stt_ms=stt.latency_ms,
+        stt_cold_start=stt.cold_start,
+        stt_model_wait_ms=stt.model_wait_ms,
+        audio_trimmed_sec=stt.trimmed_sec,
     )
 
 
+# ── Listen mode ────────────────────────────────────────────────
+
+def _listen_stt(rec, cfg: dict):
+    """Transcribe a gated utterance; None if it does not start with the wake word.
+
+    With a wake word, long utterances get a short decode of their first
+    `listen_wake_window_sec` first, so background speech never costs a full decode.
+    """
+    wake_word = cfg["listen_wake_word"]
+    window = int(cfg["listen_wake_window_sec"] * rec.sample_rate)
+    if wake_word and rec.audio.size > window:
+        with span("listen.wake_check"):
+            head = transcribe(rec.audio[:window], rec.sample_rate)
+        if not has_wake_word(head.text, wake_word):
+            return None
+    stt = _transcribe(rec)
+    _clear_line()
+    return stt if has_wake_word(stt.text, wake_word) else None
+
+
+def _handle_utterance(rec, cfg: dict) -> bool:
+    """Route a listen-mode utterance by its spoken prefix. Returns False if ignored."""
+    stt = _listen_stt(rec, cfg)
+    if stt is None:
+        return False
+    mode, rest = parse_utterance(stt.text, cfg["listen_wake_word"], cfg["listen_prefixes"])
+    if mode is None:
+        if stt.text:
+            print(f"  {DIM}(ignorado) {stt.text}{R}")
+        return False
+    if mode == "command":
+        _handle_command_mode(rec, replace(stt, text=rest))
+    else:
+        _handle_text_mode(rec, replace(stt, text=rest))
+    return True
+
+
+def _listen_loop(cfg: dict):
+    listener = Listener(on_start=_prefetch)
+    listener.start()
+    _listening(listener)
+    try:
+        while True:
+            rec = listener.wait_for_utterance()
+            trace = tracing.begin("listen", start_ns=rec.first_frame_ns)
+            if trace is not None:
+                trace.add("rec.capture", rec.first_frame_ns, rec.released_ns,
+                          audio_sec=round(rec.audio.size / rec.sample_rate, 2))
+            try:
+                handled = _handle_utterance(rec, cfg)
+            finally:
+                tracing.finish()
+            if handled:
+                _listening(listener)
+    finally:
+        listener.close()
+
+
 # ── Main ───────────────────────────────────────────────────────
 
-def main():
+def _begin_trace(rec):
+    """Start the interaction trace at key press and add the capture spans."""
+    trace = tracing.begin(f"hotkey {rec.mode}", start_ns=rec.pressed_ns or None, mode=rec.mode)
+    if trace is None or not rec.pressed_ns:
+        return
+    first_frame_ns = rec.first_frame_ns or rec.released_ns
+    trace.add("rec.hotkey_to_capture", rec.pressed_ns, first_frame_ns)
+    trace.add("rec.capture", first_frame_ns, rec.released_ns, audio_sec=round(rec.audio.size / rec.sample_rate, 2))
+
+
+def _hotkey_loop():
+    recorder = Recorder(on_start=_prefetch)
+    _waiting()
+    while True:
+        rec = recorder.wait_for_recording()
+        if rec.audio.size == 0:
+            print(f"  {RED}! Grabacion vacia{R}")
+            _waiting()
+            continue
+
+        _begin_trace(rec)
+        try:
+            if rec.mode == "command":
+                _handle_command_mode(rec)
+            elif rec.mode == "text":
+                _handle_text_mode(rec)
+        finally:
+            tracing.finish()
+
+        _waiting()
+
+
+def main(listen: bool = False):
+    """Run the interactive app: push-to-talk hotkeys, or always listening with `listen`."""
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace", line_buffering=True)
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace", line_buffering=True)
     colorama_init()
@@ -229,30 +365,21 @@ def main():
     print(f"\n{DIM}--- session {ts} ---{R}")
 
     cfg = load_config()
-    _print_banner(cfg)
+    tracing.configure(cfg)
+    _print_banner(cfg, listen=listen)
     warmup()
+    start_idle_reaper()
+    watch_config(lambda _cfg: transcriber.reload_model())
 
     if cfg.get("http_enabled"):
         from .http_server import start_server
         start_server(cfg)
 
-    recorder = Recorder()
-    _waiting()
-
     try:
-        while True:
-            rec = recorder.wait_for_recording()
-            if rec.audio.size == 0:
-                print(f"  {RED}! Grabacion vacia{R}")
-                _waiting()
-                continue
-
-            if rec.mode == "command":
-                _handle_command_mode(rec)
-            elif rec.mode == "text":
-                _handle_text_mode(rec)
-
-            _waiting()
+        if listen:
+            _listen_loop(cfg)
+        else:
+            _hotkey_loop()
     except KeyboardInterrupt:
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"\n{DIM}--- ended {ts} ---{R}")
@@ -0,0 +1,232 @@
+"""Vectorized audio clean-up applied before every Whisper decode.
+
+Steps, all in NumPy: downmix to mono, polyphase resample to 16 kHz, DC
+offset removal, energy-based trimming of leading/trailing silence and peak
+gain normalization (never amplifying clipped input).
+
+Uploaded files go through decode_file(): PyAV only decodes them to
+float32 at the file's own rate, and each frame is downmixed and resampled
+here as it arrives, so the native-rate audio is never held in full.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import gcd
+from typing import Iterator
+
+import numpy as np
+
+from .config import load_config
+from .vad import frame_rms_db
+
+TARGET_SR = 16000
+_TRIM_FRAME_MS = 20
+_CLIP_LEVEL = 0.999
+_RESAMPLE_CHUNK = 65536
+_HALF_WIDTH = 16  # filter half-length, in input/output samples of the slower rate
+
+
+@dataclass
+class PreprocessResult:
+    audio: np.ndarray  # float32 mono at TARGET_SR
+    trimmed_sec: float  # leading + trailing audio removed
+    clipped_ratio: float  # fraction of samples at full scale
+    gain_db: float
+
+
+@lru_cache(maxsize=8)
+def _polyphase_filter(up: int, down: int, beta: float = 6.0) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass split into `up` phases: shape (up, taps)."""
+    factor = max(up, down)
+    length = 2 * _HALF_WIDTH * factor + 1
+    center = (length - 1) / 2
+    cutoff = 0.5 / factor
+    n = np.arange(length) - center
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta)
+    h *= up / h.sum()  # unity passband gain after zero-stuffing
+    taps = -(-length // up)
+    padded = np.zeros(taps * up)
+    padded[:length] = h
+    return padded.reshape(taps, up).T.astype(np.float32)
+
+
+class _PolyphaseResampler:
+    """Streaming rational-factor polyphase resampler.
+
+    Equivalent to zero-stuffing by `up`, low-pass filtering and keeping every
+    `down`-th sample, but only the filter taps that hit non-zero input are
+    evaluated: each output sample is a dot product with one filter phase.
+    feed() returns every output sample whose inputs have all arrived and keeps
+    only the input history the next one needs, so a long stream can be
+    resampled block by block with the same result as resampling it whole.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int = TARGET_SR):
+        g = gcd(orig_sr, target_sr)
+        self.up, self.down = target_sr // g, orig_sr // g
+        self.passthrough = orig_sr == target_sr
+        self.phases = _polyphase_filter(self.up, self.down)
+        self.taps = self.phases.shape[1]
+        self.center = _HALF_WIDTH * max(self.up, self.down)
+        self._history = np.zeros(self.taps, dtype=np.float32)  # leading zero pad
+        self._base = -self.taps  # input index of _history[0]
+        self._n_in = 0
+        self._n_out = 0
+
+    def feed(self, block: np.ndarray, final: bool = False) -> np.ndarray:
+        block = block.astype(np.float32, copy=False)
+        if self.passthrough:
+            return block
+        self._n_in += block.size
+        if final:
+            end = -(-self._n_in * self.up // self.down)
+            buf = np.concatenate([self._history, block, np.zeros(self.taps, dtype=np.float32)])
+        else:
+            # Outputs whose newest input sample, (n * down + center) // up, has arrived
+            end = max(self._n_out, (self._n_in * self.up - self.center - 1) // self.down + 1)
+            buf = np.concatenate([self._history, block])
+        out = self._compute(buf, self._n_out, end)
+
+        keep_from = (end * self.down + self.center) // self.up - self.taps + 1
+        drop = min(max(0, keep_from - self._base), self._n_in - self._base)
+        self._history = buf[drop:self._n_in - self._base]
+        self._base += drop
+        self._n_out = end
+        return out
+
+    def _compute(self, buf: np.ndarray, start: int, end: int) -> np.ndarray:
+        out = np.empty(end - start, dtype=np.float32)
+        offsets = np.arange(self.taps)
+        for first in range(start, end, _RESAMPLE_CHUNK):
+            n = np.arange(first, min(first + _RESAMPLE_CHUNK, end), dtype=np.int64)
+            pos = n * self.down + self.center
+            j_hi = pos // self.up
+            phase = pos % self.up
+            idx = j_hi[:, None] - offsets[None, :] - self._base
+            np.clip(idx, 0, buf.size - 1, out=idx)
+            out[first - start:first - start + n.size] = np.einsum("ij,ij->i", buf[idx], self.phases[phase])
+        return out
+
+
+def resample_poly(audio: np.ndarray, orig_sr: int, target_sr: int = TARGET_SR) -> np.ndarray:
+    """Resample a whole mono array; see _PolyphaseResampler."""
+    if orig_sr == target_sr or audio.size == 0:
+        return audio.astype(np.float32, copy=False)
+    return _PolyphaseResampler(orig_sr, target_sr).feed(audio, final=True)
+
+
+class _OutputBuffer:
+    """Append-only float32 buffer, so decode_file never holds its output twice."""
+
+    def __init__(self, capacity: int):
+        self._data = np.empty(capacity, dtype=np.float32)
+        self._size = 0
+
+    def append(self, block: np.ndarray) -> None:
+        end = self._size + block.size
+        if end > self._data.size:
+            grown = np.empty(max(end, self._data.size * 2), dtype=np.float32)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = block
+        self._size = end
+
+    def array(self) -> np.ndarray:
+        return self._data[:self._size]
+
+
+def _decode_mono(container, stream) -> Iterator[np.ndarray]:
+    """Yield each decoded frame of `stream` as float32 mono at its native rate."""
+    import av
+
+    codec = stream.codec_context
+    converter = av.AudioResampler(format="fltp", layout=codec.layout, rate=codec.sample_rate)
+    frames = container.decode(stream)
+    while True:
+        try:
+            frame = next(frames)
+        except StopIteration:
+            break
+        except av.error.InvalidDataError:
+            continue  # skip corrupt packets, as faster_whisper.decode_audio does
+        for out in converter.resample(frame):
+            planes = out.to_ndarray()
+            yield planes[0] if planes.shape[0] == 1 else planes.mean(axis=0)
+    for out in converter.resample(None):
+        planes = out.to_ndarray()
+        yield planes[0] if planes.shape[0] == 1 else planes.mean(axis=0)
+
+
+def decode_file(path: str) -> tuple[np.ndarray, float]:
+    """Decode an audio file to float32 mono at TARGET_SR. Returns (audio, original duration).
+
+    Frames are downmixed as they arrive and resampled every _RESAMPLE_CHUNK
+    input samples, so the native-rate audio is never held in full.
+    """
+    # Imported lazily like faster_whisper; PyAV comes with it
+    import av
+
+    pending: list[np.ndarray] = []
+    pending_size = total = 0
+    with av.open(path, mode="r", metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        sample_rate = stream.codec_context.sample_rate
+        resampler = _PolyphaseResampler(sample_rate)
+        # Sized from the container's duration when it has one; grown if that was short
+        estimate = (container.duration or 0) * TARGET_SR // 1_000_000 + _RESAMPLE_CHUNK
+        out = _OutputBuffer(estimate)
+        for mono in _decode_mono(container, stream):
+            pending.append(mono)
+            pending_size += mono.size
+            total += mono.size
+            if pending_size >= _RESAMPLE_CHUNK:
+                out.append(resampler.feed(np.concatenate(pending)))
+                pending, pending_size = [], 0
+    tail = np.concatenate(pending) if pending else np.empty(0, dtype=np.float32)
+    out.append(resampler.feed(tail, final=True))
+    return out.array(), total / sample_rate
+
+
+def preprocess(audio: np.ndarray, sample_rate: int, trim_leading: bool = True) -> PreprocessResult:
+    """Clean up `audio` for Whisper; see module docstring.
+
+    `trim_leading=False` keeps leading silence so segment timestamps stay
+    aligned with the original audio.
+    """
+    cfg = load_config()
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    audio = resample_poly(audio, sample_rate, TARGET_SR)
+    if not cfg["preprocess_enabled"] or audio.size == 0:
+        return PreprocessResult(audio, 0.0, 0.0, 0.0)
+
+    clipped_ratio = float(np.count_nonzero(np.abs(audio) >= _CLIP_LEVEL)) / audio.size
+    audio = audio - audio.mean()
+
+    original = audio.size
+    audio = _trim_silence(audio, cfg, trim_leading)
+    trimmed_sec = (original - audio.size) / TARGET_SR
+
+    gain_db = 0.0
+    peak = float(max(audio.max(), -audio.min())) if audio.size else 0.0  # no |audio| temporary
+    if peak > 0:
+        wanted_db = cfg["preprocess_target_peak_db"] - 20 * np.log10(peak)
+        ceiling_db = 0.0 if clipped_ratio > 0 else cfg["preprocess_max_gain_db"]
+        gain_db = float(min(wanted_db, ceiling_db))
+        if gain_db != 0.0:
+            audio *= np.float32(10 ** (gain_db / 20))  # in place: `audio` is our DC-removed copy
+
+    return PreprocessResult(audio, round(trimmed_sec, 2), round(clipped_ratio, 4), round(gain_db, 1))
+
+
+def _trim_silence(audio: np.ndarray, cfg: dict, trim_leading: bool) -> np.ndarray:
+    frame_len = TARGET_SR * _TRIM_FRAME_MS // 1000
+    levels = frame_rms_db(audio, frame_len)
+    voiced = np.flatnonzero(levels > cfg["preprocess_trim_db"])
+    if voiced.size == 0:
+        return audio  # nothing above threshold: leave it to Whisper's own VAD
+    pad = TARGET_SR * cfg["preprocess_trim_pad_ms"] // 1000
+    start = max(0, voiced[0] * frame_len - pad) if trim_leading else 0
+    end = min(audio.size, (voiced[-1] + 1) * frame_len + pad)
+    return audio[start:end]
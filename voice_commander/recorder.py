@@ -1,7 +1,9 @@
 """Audio recording with push-to-talk hotkeys."""
 
 import threading
+import time
 from dataclasses import dataclass
+from typing import Callable
 
 import keyboard
 import numpy as np
@@ -15,13 +17,18 @@ class Recording:
     audio: np.ndarray
     mode: str  # "command" or "text"
     sample_rate: int
+    # perf_counter_ns timestamps for tracing; 0 if unknown
+    pressed_ns: int = 0
+    first_frame_ns: int = 0
+    released_ns: int = 0
 
 
 class Recorder:
     """Push-to-talk audio recorder with dual hotkeys."""
 
-    def __init__(self):
+    def __init__(self, on_start: Callable[[str], None] | None = None):
         cfg = load_config()
+        self._on_start = on_start
         self.sample_rate = cfg["sample_rate"]
         self.channels = cfg["channels"]
         self.hotkey_command = cfg["hotkey_command"]
@@ -33,9 +40,13 @@ class Recorder:
         self._current_mode: str | None = None
         self._result_event = threading.Event()
         self._result: Recording | None = None
+        self._pressed_ns = 0
+        self._first_frame_ns = 0
 
     def _audio_callback(self, indata, frames, time_info, status):
         if self._recording:
+            if not self._first_frame_ns:
+                self._first_frame_ns = time.perf_counter_ns()
             self._buffer.append(indata.copy())
 
     def _start_recording(self, mode: str):
@@ -43,12 +54,17 @@ class Recorder:
             return
         self._current_mode = mode
         self._buffer.clear()
+        self._pressed_ns = time.perf_counter_ns()
+        self._first_frame_ns = 0
         self._recording = True
+        if self._on_start is not None:
+            self._on_start(mode)
 
     def _stop_recording(self):
         if not self._recording:
             return
         self._recording = False
+        released_ns = time.perf_counter_ns()
         if self._buffer:
             audio = np.concatenate(self._buffer, axis=0).flatten()
         else:
@@ -57,6 +73,9 @@ class Recorder:
             audio=audio,
             mode=self._current_mode,
             sample_rate=self.sample_rate,
+            pressed_ns=self._pressed_ns,
+            first_frame_ns=self._first_frame_ns,
+            released_ns=released_ns,
         )
         self._result_event.set()
 
@@ -0,0 +1,108 @@
+"""Headless ASR server: `voice-commander serve`.
+
+Loads only the HTTP/ASR stack (no keyboard, audio device, clipboard or
+terminal UI). The socket is bound first and the Whisper model loads in a
+background thread, so /health answers immediately and reports readiness.
+"""
+
+import argparse
+import logging
+import threading
+import time
+
+from .config import load_config, set_overrides, watch_config
+from .fake_model import FAKE_MODEL
+
+log = logging.getLogger("voice_commander.serve")
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="voice-commander serve", description="Run the headless ASR server")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--model", default=None, help="override whisper_model")
+    parser.add_argument("--device", default=None, help="override whisper_device")
+    parser.add_argument("--compute-type", default=None, help="override whisper_compute_type")
+    parser.add_argument("--workers", type=int, default=None, help="decode in N worker processes")
+    parser.add_argument(
+        "--fake-model",
+        action="store_true",
+        help="sleep instead of decoding (fake_model_rtf x audio duration), for load tests",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None, started_at: float | None = None) -> None:
+    """Run the server until interrupted. `started_at` is the perf_counter() at process entry."""
+    t_start = started_at if started_at is not None else time.perf_counter()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = _parse_args(argv)
+
+    overrides = {
+        "http_host": args.host,
+        "http_port": args.port,
+        "whisper_model": FAKE_MODEL if args.fake_model else args.model,
+        "whisper_device": args.device,
+        "whisper_compute_type": args.compute_type,
+        "http_workers": args.workers,
+    }
+    set_overrides(**{k: v for k, v in overrides.items() if v is not None})
+    cfg = load_config()
+
+    t_import = time.perf_counter()
+    from werkzeug.serving import make_server
+
+    from . import http_server, tracing, transcriber
+    from .idle import start_idle_reaper
+    import_ms = int((time.perf_counter() - t_import) * 1000)
+
+    tracing.configure(cfg)
+    http_server.app.config["MAX_CONTENT_LENGTH"] = cfg["http_max_content_mb"] * 1024 * 1024
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    http_server.set_readiness(ready=False, import_ms=import_ms)
+
+    server = make_server(cfg["http_host"], cfg["http_port"], http_server.app, threaded=True)
+    bound_ms = int((time.perf_counter() - t_start) * 1000)
+    log.info("Listening on %s:%d (imports %dms, bound %dms)", cfg["http_host"], cfg["http_port"], import_ms, bound_ms)
+
+    pool = None
+    if cfg["http_workers"] > 0:
+        from .workers import WorkerPool
+
+        pool = WorkerPool(cfg["http_workers"], cfg["http_worker_cores"])
+        pool.start()
+        http_server.set_worker_pool(pool)
+
+    def _load():
+        t0 = time.perf_counter()
+        if pool is not None:
+            if not pool.wait_ready():
+                http_server.set_readiness(error="no ASR worker could load the model; see workers[].error")
+                log.error("No ASR worker became ready; see /health")
+                return
+        else:
+            transcriber.load_model()
+        load_ms = int((time.perf_counter() - t0) * 1000)
+        ready_ms = int((time.perf_counter() - t_start) * 1000)
+        http_server.set_readiness(ready=True, model_load_ms=load_ms, time_to_ready_ms=ready_ms)
+        log.info("Model %s ready (load %dms, time to ready %dms)", cfg["whisper_model"], load_ms, ready_ms)
+
+    threading.Thread(target=_load, daemon=True, name="model-load").start()
+    if pool is None:
+        start_idle_reaper()
+        watch_config(lambda _cfg: transcriber.reload_model())
+    else:
+        def _reload_all(_cfg):
+            pool.reload_model()
+            transcriber.reload_model()  # the front model used by streamed formats, if loaded
+
+        watch_config(_reload_all)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if pool is not None:
+            pool.stop()
@@ -0,0 +1,239 @@
+"""`voice-commander stats`: latency analytics over the interaction logs.
+
+A columnar sidecar index lives in `<log_dir>/.stats/`. Each log file,
+including the rotated `interactions_<ts>.jsonl` files, is identified by the
+`id` of its first record, so a file keeps its cached columns when rotation
+renames it. The manifest stores how many bytes of each file have been
+parsed; every run parses only the bytes appended since then.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .config import load_config
+
+_INDEX_VERSION = 2  # bump when row parsing changes, to rebuild old indexes
+_STRING_COLUMNS = ("mode", "whisper_model", "ollama_model", "language")
+_FLOAT_COLUMNS = ("ts", "stt", "llm")
+GROUP_COLUMNS = {
+    "model": "whisper_model",
+    "ollama_model": "ollama_model",
+    "language": "language",
+    "mode": "mode",
+}
+METRIC_COLUMNS = {"stt": "stt", "llm": "llm"}
+
+
+def _index_dir(log_dir: str) -> str:
+    return os.path.join(log_dir, ".stats")
+
+
+def _load_manifest(index_dir: str) -> dict:
+    try:
+        with open(os.path.join(index_dir, "index.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": _INDEX_VERSION, "files": {}}
+    if manifest.get("version") != _INDEX_VERSION:
+        return {"version": _INDEX_VERSION, "files": {}}
+    return manifest
+
+
+def _save_manifest(index_dir: str, manifest: dict) -> None:
+    path = os.path.join(index_dir, "index.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{path}.tmp", path)
+
+
+def _fingerprint(path: str) -> str | None:
+    """The first record's id, which survives rotation renames."""
+    with open(path, "rb") as f:
+        first = f.readline()
+    if not first.endswith(b"\n"):
+        return None
+    try:
+        return json.loads(first)["id"]
+    except (ValueError, KeyError):
+        return None
+
+
+def _parse_rows(data: bytes) -> dict[str, list]:
+    cols: dict[str, list] = {name: [] for name in _STRING_COLUMNS + _FLOAT_COLUMNS}
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            ts = datetime.fromisoformat(entry["timestamp"]).timestamp()
+        except (ValueError, KeyError):
+            continue
+        cols["ts"].append(ts)
+        cols["mode"].append(entry.get("mode") or "")
+        cols["whisper_model"].append(entry.get("whisper_model") or "")
+        cols["ollama_model"].append(entry.get("ollama_model") or "")
+        cols["language"].append(entry.get("detected_language") or "")
+        # A cached transcription had no decode; keep it out of STT percentiles
+        cols["stt"].append(np.nan if entry.get("stt_cache_hit") else _num(entry.get("latency_stt_ms")))
+        cols["llm"].append(_num(entry.get("latency_llm_ms")))
+    return cols
+
+
+def _num(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _to_arrays(cols: dict[str, list]) -> dict[str, np.ndarray]:
+    arrays = {name: np.array(cols[name], dtype=str) for name in _STRING_COLUMNS}
+    arrays.update({name: np.array(cols[name], dtype=np.float64) for name in _FLOAT_COLUMNS})
+    return arrays
+
+
+def _load_columns(path: str) -> dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def update_index(log_dir: str) -> tuple[dict, int]:
+    """Bring the sidecar index up to date. Returns (manifest, bytes parsed)."""
+    index_dir = _index_dir(log_dir)
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = _load_manifest(index_dir)
+    files = manifest["files"]
+    seen = set()
+    parsed_bytes = 0
+
+    for path in sorted(glob.glob(os.path.join(log_dir, "interactions*.jsonl"))):
+        fp = _fingerprint(path)
+        if fp is None:
+            continue
+        seen.add(fp)
+        size = os.path.getsize(path)
+        entry = files.get(fp)
+        npz_path = os.path.join(index_dir, f"{fp}.npz")
+        if entry is None or entry["offset"] > size or not os.path.exists(npz_path):
+            entry = {"offset": 0, "rows": 0}
+            existing = None
+        elif entry["offset"] == size:
+            entry["path"] = os.path.basename(path)
+            continue
+        else:
+            existing = _load_columns(npz_path)
+
+        with open(path, "rb") as f:
+            f.seek(entry["offset"])
+            data = f.read(size - entry["offset"])
+        complete = data.rfind(b"\n") + 1  # leave a partially written last line for next time
+        if complete == 0:
+            continue
+        parsed_bytes += complete
+        new = _to_arrays(_parse_rows(data[:complete]))
+        if existing is not None:
+            new = {name: np.concatenate([existing[name], new[name]]) for name in new}
+        np.savez(npz_path, **new)
+
+        entry.update(path=os.path.basename(path), offset=entry["offset"] + complete, rows=int(new["ts"].size))
+        files[fp] = entry
+
+    for fp in list(files):
+        if fp not in seen:
+            del files[fp]
+            try:
+                os.unlink(os.path.join(index_dir, f"{fp}.npz"))
+            except OSError:
+                pass
+
+    _save_manifest(index_dir, manifest)
+    return manifest, parsed_bytes
+
+
+def load_table(log_dir: str, manifest: dict) -> dict[str, np.ndarray]:
+    """Concatenate every indexed file into one set of columns."""
+    index_dir = _index_dir(log_dir)
+    parts = [_load_columns(os.path.join(index_dir, f"{fp}.npz")) for fp in manifest["files"]]
+    if not parts:
+        return _to_arrays({name: [] for name in _STRING_COLUMNS + _FLOAT_COLUMNS})
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def summarize(
+    table: dict[str, np.ndarray],
+    metric: str = "stt",
+    by: str | None = None,
+    since: float | None = None,
+    percentiles: tuple[float, ...] = (50, 95, 99),
+) -> list[dict]:
+    """Percentiles of a latency column, optionally grouped."""
+    values = table[METRIC_COLUMNS[metric]]
+    mask = ~np.isnan(values)
+    if since is not None:
+        mask &= table["ts"] >= since
+    keys = table[GROUP_COLUMNS[by]][mask] if by else np.full(int(mask.sum()), "all")
+    values = values[mask]
+
+    rows = []
+    for key in np.unique(keys):
+        group = values[keys == key]
+        row = {"group": str(key) or "-", "n": int(group.size), "mean": float(group.mean())}
+        for p, v in zip(percentiles, np.percentile(group, percentiles)):
+            row[f"p{p:g}"] = float(v)
+        rows.append(row)
+    rows.sort(key=lambda r: r["n"], reverse=True)
+    return rows
+
+
+def _parse_since(text: str | None) -> float | None:
+    if not text:
+        return None
+    m = re.fullmatch(r"(\d+)([smhdw])", text)
+    if m is None:
+        return datetime.fromisoformat(text).timestamp()
+    unit = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}[m.group(2)]
+    return (datetime.now() - timedelta(**{unit: int(m.group(1))})).timestamp()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="voice-commander stats", description="Latency stats over interaction logs")
+    parser.add_argument("--metric", choices=sorted(METRIC_COLUMNS), default="stt")
+    parser.add_argument("--by", choices=sorted(GROUP_COLUMNS), default=None)
+    parser.add_argument("--since", default=None, help="e.g. 7d, 12h, or an ISO date")
+    parser.add_argument("--percentiles", default="50,95,99")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    log_dir = load_config()["log_dir"]
+    t0 = time.perf_counter()
+    manifest, parsed = update_index(log_dir)
+    t1 = time.perf_counter()
+    table = load_table(log_dir, manifest)
+    percentiles = tuple(float(p) for p in args.percentiles.split(","))
+    rows = summarize(table, args.metric, args.by, _parse_since(args.since), percentiles)
+    t2 = time.perf_counter()
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+
+    cols = ["group", "n", "mean"] + [f"p{p:g}" for p in percentiles]
+    width = max([len(r["group"]) for r in rows] + [len(args.by or "group")])
+    print(f"{(args.by or 'group'):<{width}}  " + "  ".join(f"{c:>8}" for c in cols[1:]) + f"   ({args.metric} ms)")
+    for r in rows:
+        cells = [f"{r['n']:>8d}"] + [f"{r[c]:>8.0f}" for c in cols[2:]]
+        print(f"{r['group']:<{width}}  " + "  ".join(cells))
+    print(
+        f"\n{int(table['ts'].size)} rows in {len(manifest['files'])} files; "
+        f"parsed {parsed / 1024:.0f} KB new in {(t1 - t0) * 1000:.0f}ms, query {(t2 - t1) * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Minimal live-dictation client for the /stream WebSocket endpoint.
+
+Streams a 16 kHz mono 16-bit WAV file in real-time-sized chunks and prints
+partial/final hypotheses as they arrive:
+
+    python -m voice_commander.stream_client audio.wav --url ws://localhost:9090/stream
+"""
+
+import argparse
+import json
+import threading
+import time
+import wave
+
+from simple_websocket import Client, ConnectionClosed
+
+CHUNK_MS = 100
+
+
+def stream_wav(path: str, url: str, language: str | None = None, realtime: bool = True) -> list[dict]:
+    """Send a WAV file to the server and return every event received."""
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != 16000 or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError("WAV must be 16 kHz, mono, 16-bit PCM")
+        pcm = wav.readframes(wav.getnframes())
+
+    if language:
+        url = f"{url}?language={language}"
+    ws = Client.connect(url)
+    events: list[dict] = []
+
+    def _receive():
+        try:
+            while True:
+                event = json.loads(ws.receive())
+                events.append(event)
+                print(f"[{event['type']}] {event.get('text') or event.get('message', '')}")
+                if event["type"] in ("done", "error"):
+                    return
+        except ConnectionClosed:
+            return
+
+    receiver = threading.Thread(target=_receive, daemon=True)
+    receiver.start()
+
+    chunk_bytes = 16000 * 2 * CHUNK_MS // 1000
+    for i in range(0, len(pcm), chunk_bytes):
+        ws.send(pcm[i:i + chunk_bytes])
+        if realtime:
+            time.sleep(CHUNK_MS / 1000)
+    ws.send("EOF")
+
+    receiver.join()
+    try:
+        ws.close()
+    except (ConnectionClosed, OSError):
+        pass  # the server closes the socket after "done"/"error"
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a WAV file to /stream")
+    parser.add_argument("wav")
+    parser.add_argument("--url", default="ws://localhost:9090/stream")
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--fast", action="store_true", help="send as fast as possible")
+    args = parser.parse_args()
+    stream_wav(args.wav, args.url, language=args.language, realtime=not args.fast)
+
+
+if __name__ == "__main__":
+    main()
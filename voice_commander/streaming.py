@@ -0,0 +1,163 @@
+"""Live dictation sessions: incremental decoding of streamed PCM frames.
+
+Audio arrives in small chunks while the user is still speaking. An energy
+VAD decides when an utterance ends; at that point the buffered audio is
+decoded and committed as a final hypothesis. While speech is ongoing the
+buffer is re-decoded periodically to produce partial hypotheses.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+from .config import load_config
+from .transcriber import TranscriptionResult, transcribe, transcribe_lock
+from .vad import EnergyVAD
+
+SAMPLE_RATE = 16000
+ENCODINGS = {
+    "pcm_s16le": np.dtype("<i2"),
+    "f32le": np.dtype("<f4"),
+}
+
+_active = 0
+_active_lock = threading.Lock()
+
+
+class DictationSession:
+    """One client's live-dictation state.
+
+    The audio buffer is preallocated to `stream_max_buffer_sec`, which caps
+    per-session memory; an utterance longer than that is force-committed.
+    """
+
+    def __init__(self, language: str | None = None, encoding: str = "pcm_s16le"):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+        cfg = load_config()
+        self.language = language if language not in ("auto", "") else None
+        self._dtype = ENCODINGS[encoding]
+        self._partial_every = int(cfg["stream_partial_interval_sec"] * SAMPLE_RATE)
+        self._preroll = int(cfg["stream_preroll_ms"] * SAMPLE_RATE / 1000)
+        self._vad = EnergyVAD(
+            SAMPLE_RATE,
+            threshold_db=cfg["vad_threshold_db"],
+            hangover_ms=cfg["stream_silence_ms"],
+        )
+
+        self._buf = np.zeros(int(cfg["stream_max_buffer_sec"] * SAMPLE_RATE), dtype=np.float32)
+        self._len = 0
+        self._offset = 0  # stream position (samples) of _buf[0]
+        self._last_partial = 0
+        self._has_speech = False
+        self._leftover = b""
+
+    def feed(self, data: bytes) -> list[dict]:
+        """Append raw PCM bytes; return any partial/final events produced."""
+        audio = self._decode(data)
+        events = []
+        capacity = self._buf.size
+        while audio.size:
+            room = capacity - self._len
+            if room == 0:
+                events.extend(self._commit())
+                continue
+            chunk, audio = audio[:room], audio[room:]
+            events.extend(self._process(chunk))
+        return events
+
+    def finish(self) -> list[dict]:
+        """Flush the pending utterance at end of stream."""
+        return self._commit()
+
+    # ── Internals ─────────────────────────────────────────────
+
+    def _decode(self, data: bytes) -> np.ndarray:
+        data = self._leftover + data
+        usable = len(data) - len(data) % self._dtype.itemsize
+        self._leftover = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self._dtype)
+        if self._dtype.kind == "i":
+            return samples.astype(np.float32) / 32768.0
+        return samples.astype(np.float32)
+
+    def _process(self, chunk: np.ndarray) -> list[dict]:
+        self._buf[self._len:self._len + chunk.size] = chunk
+        self._len += chunk.size
+
+        vad_events = self._vad.process(chunk)
+        if "start" in vad_events:
+            self._has_speech = True
+        if "end" in vad_events:
+            return self._commit()
+
+        if not self._has_speech:
+            self._drop_silence()
+            return []
+
+        # Partials are best-effort: skip them while another decode holds the model
+        if self._len - self._last_partial >= self._partial_every and not transcribe_lock.locked():
+            self._last_partial = self._len
+            result = self._transcribe()
+            if result.text:
+                return [self._event("partial", result)]
+        return []
+
+    def _drop_silence(self) -> None:
+        """Keep only a short pre-roll of leading silence."""
+        excess = self._len - self._preroll
+        if excess > 0:
+            self._buf[:self._preroll] = self._buf[excess:self._len]
+            self._len = self._preroll
+            self._offset += excess
+
+    def _commit(self) -> list[dict]:
+        events = []
+        if self._has_speech and self._len:
+            result = self._transcribe()
+            if result.text:
+                events.append(self._event("final", result))
+        self._offset += self._len
+        self._len = 0
+        self._last_partial = 0
+        self._has_speech = False
+        self._vad.reset()
+        return events
+
+    def _transcribe(self) -> TranscriptionResult:
+        return transcribe(self._buf[:self._len].copy(), SAMPLE_RATE, language=self.language)
+
+    def _event(self, kind: str, result: TranscriptionResult) -> dict:
+        return {
+            "type": kind,
+            "text": result.text,
+            "language": result.language,
+            "start": round(self._offset / SAMPLE_RATE, 2),
+            "end": round((self._offset + self._len) / SAMPLE_RATE, 2),
+            "latency_ms": result.latency_ms,
+            "cold_start": result.cold_start,
+            "model_wait_ms": result.model_wait_ms,
+            "model": result.model_key[0],
+        }
+
+
+@contextmanager
+def open_session(**kwargs) -> Iterator[DictationSession]:
+    """Create a session, enforcing the `stream_max_sessions` limit."""
+    global _active
+    cfg = load_config()
+    with _active_lock:
+        if _active >= cfg["stream_max_sessions"]:
+            raise RuntimeError("Too many concurrent streaming sessions")
+        _active += 1
+    try:
+        yield DictationSession(**kwargs)
+    finally:
+        with _active_lock:
+            _active -= 1
+
+
+def active_sessions() -> int:
+    return _active
@@ -0,0 +1,155 @@
+"""Per-interaction span tracing, exported as Chrome trace / Perfetto JSON.
+
+A trace is bound to the current thread with begin(); span() then records
+complete ("X") events against it. When no trace is active (tracing disabled,
+or the request was not sampled) span() returns a shared no-op context
+manager, so instrumented code pays one thread-local lookup.
+
+Open the written files in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+
+_local = threading.local()
+_enabled = False
+_trace_dir = ""
+_http_sample_rate = 0.0
+
+
+def configure(cfg: dict) -> None:
+    """Apply trace_* settings. Called once at startup."""
+    global _enabled, _trace_dir, _http_sample_rate
+    _enabled = bool(cfg["trace_enabled"])
+    _trace_dir = cfg["trace_dir"]
+    _http_sample_rate = float(cfg["trace_http_sample_rate"])
+
+
+def http_sample_rate() -> float:
+    return _http_sample_rate
+
+
+class Trace:
+    """Events of one interaction (hotkey cycle or HTTP request)."""
+
+    def __init__(self, name: str, start_ns: int | None = None, **args):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.args = args
+        self.start_ns = start_ns if start_ns is not None else time.perf_counter_ns()
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start_ns: int, end_ns: int, tid: int | None = None, **args) -> None:
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start_ns - self.start_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": tid if tid is not None else threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def to_chrome(self) -> dict:
+        end_ns = time.perf_counter_ns()
+        root = {
+            "name": self.name,
+            "cat": "interaction",
+            "ph": "X",
+            "ts": 0,
+            "dur": (end_ns - self.start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"trace_id": self.id, **self.args},
+        }
+        return {"traceEvents": [root, *self.events], "displayTimeUnit": "ms"}
+
+
+class _Span:
+    __slots__ = ("_trace", "_name", "_args", "_start")
+
+    def __init__(self, trace: Trace, name: str, args: dict):
+        self._trace = trace
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._trace.add(self._name, self._start, time.perf_counter_ns(), **self._args)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **args):
+    """Context manager timing `name` within the current thread's trace."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, args)
+
+
+def begin(name: str, sample_rate: float = 1.0, start_ns: int | None = None, **args) -> Trace | None:
+    """Start a trace on this thread. Returns None if disabled or not sampled."""
+    if not _enabled or (sample_rate < 1.0 and random.random() >= sample_rate):
+        _local.trace = None
+        return None
+    trace = Trace(name, start_ns=start_ns, **args)
+    _local.trace = trace
+    return trace
+
+
+def current() -> Trace | None:
+    return getattr(_local, "trace", None)
+
+
+def attach(trace: Trace | None) -> None:
+    """Bind an existing trace to this thread (e.g. a response generator)."""
+    _local.trace = trace
+
+
+def detach() -> Trace | None:
+    """Unbind and return this thread's trace without writing it."""
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    return trace
+
+
+def finish(trace: Trace | None = None) -> str | None:
+    """Write the trace (default: this thread's) and unbind it. Returns the file path."""
+    if trace is None:
+        trace = detach()
+    elif current() is trace:
+        detach()
+    if trace is None:
+        return None
+    os.makedirs(_trace_dir, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(_trace_dir, f"{ts}_{trace.name.replace('/', '_').replace(' ', '_')}_{trace.id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace.to_chrome(), f)
+    return path
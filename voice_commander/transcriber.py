@@ -1,14 +1,24 @@
 """Speech-to-text using faster-whisper."""
 
+import gc
+import queue
 import sys
 import threading
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator
 
 import numpy as np
-from faster_whisper import WhisperModel
 
+from . import tracing
 from .config import load_config
+from .fake_model import FAKE_MODEL, FakeWhisperModel
+from .preprocess import TARGET_SR, PreprocessResult, decode_file, preprocess
+from .tracing import span
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 
 @dataclass
@@ -17,22 +27,239 @@ class TranscriptionResult:
     language: str
     audio_duration_sec: float
     latency_ms: int
+    cold_start: bool = False  # model had been evicted and was reloaded for this call
+    model_wait_ms: int = 0  # time blocked waiting for the model to finish loading
+    trimmed_sec: float = 0.0  # silence removed by preprocessing before decoding
+    queue_ms: int = 0  # time queued behind other decodes (transcribe_lock or worker queue)
+    # (model, device, compute_type) that decoded; mid hot-swap config may already name the next one
+    model_key: tuple[str, str, str] = ("", "", "")
+
+
+@dataclass
+class StreamInfo:
+    """Filled in by stream_file() as decoding progresses."""
+    language: str = ""
+    audio_duration_sec: float = 0.0
+    latency_ms: int = 0
+    text: str = ""
+    cold_start: bool = False
+    model_wait_ms: int = 0
+    trimmed_sec: float = 0.0
+    queue_ms: int = 0
+    model_key: tuple[str, str, str] = ("", "", "")
 
 
-_model: WhisperModel | None = None
 transcribe_lock = threading.Lock()
+_STREAM_END = object()  # sentinel closing stream_file's segment queue
 
 
-def _get_model() -> WhisperModel:
-    global _model
-    if _model is None:
-        cfg = load_config()
-        _model = WhisperModel(
-            cfg["whisper_model"],
-            device=cfg["whisper_device"],
-            compute_type=cfg["whisper_compute_type"],
-        )
-    return _model
+def _model_key(cfg: dict) -> tuple[str, str, str]:
+    return (cfg["whisper_model"], cfg["whisper_device"], cfg["whisper_compute_type"])
+
+
+def _load_model(key: tuple[str, str, str]) -> "WhisperModel":
+    name, device, compute_type = key
+    cfg = load_config()
+    if name == FAKE_MODEL:
+        return FakeWhisperModel(rtf=cfg["fake_model_rtf"])
+
+    # Imported lazily: faster_whisper pulls in ctranslate2/av/tokenizers
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(name, device=device, compute_type=compute_type, cpu_threads=cfg["whisper_cpu_threads"])
+
+
+class _ModelSlot:
+    """A loaded model plus the number of in-flight requests using it."""
+
+    def __init__(self, model: "WhisperModel", key: tuple[str, str, str]):
+        self.model = model
+        self.key = key
+        self.refs = 0
+
+
+class _ModelHolder:
+    """Double-buffered model holder.
+
+    New requests always take the active slot. swap() loads a replacement in
+    the background, switches the active slot atomically, waits for requests
+    still running on the old model to drain, then frees it. unload() drains
+    and frees the active slot the same way (idle eviction).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._load_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._active: _ModelSlot | None = None
+        self.last_used = time.monotonic()
+        self.cold_pending = False  # set on eviction, consumed by the next transcription
+
+    @property
+    def active_key(self) -> tuple[str, str, str] | None:
+        slot = self._active
+        return slot.key if slot else None
+
+    def is_loading(self) -> bool:
+        return self._load_lock.locked() or self._swap_lock.locked()
+
+    def ensure_loaded(self) -> None:
+        with self._load_lock:
+            if self._active is not None:
+                return
+            key = _model_key(load_config())
+            model = _load_model(key)
+            with self._cond:
+                self._active = _ModelSlot(model, key)
+
+    def acquire(self) -> _ModelSlot:
+        while True:
+            with self._cond:
+                slot = self._active
+                if slot is not None:
+                    slot.refs += 1
+                    self.last_used = time.monotonic()
+                    return slot
+            self.ensure_loaded()
+
+    def take_cold_start(self) -> bool:
+        with self._cond:
+            cold = self.cold_pending
+            self.cold_pending = False
+            return cold
+
+    def release(self, slot: _ModelSlot) -> None:
+        with self._cond:
+            slot.refs -= 1
+            self._cond.notify_all()
+
+    def swap(self) -> bool:
+        """Load the configured model and switch to it. False if nothing changed."""
+        if not self._swap_lock.acquire(blocking=False):
+            return False
+        try:
+            key = _model_key(load_config())
+            if self._active is None or self._active.key == key:
+                return False
+            model = _load_model(key)
+            with self._cond:
+                old = self._active
+                self._active = _ModelSlot(model, key)
+            if old is not None:
+                self._drain(old)
+            return True
+        finally:
+            self._swap_lock.release()
+
+    def unload(self) -> bool:
+        with self._load_lock, self._cond:
+            old = self._active
+            if old is None:
+                return False
+            self._active = None
+            self.cold_pending = True
+        self._drain(old)
+        return True
+
+    def _drain(self, slot: _ModelSlot) -> None:
+        with self._cond:
+            while slot.refs:
+                self._cond.wait()
+            slot.model = None
+        gc.collect()
+
+
+_holder = _ModelHolder()
+
+
+@contextmanager
+def _use_model() -> Iterator[tuple["WhisperModel", tuple[str, str, str], int, bool]]:
+    """Yield (model, its key, ms spent waiting for it to load, whether this is a cold start).
+
+    The model stays referenced until the block exits, so a concurrent swap
+    or eviction waits for this request to finish before freeing it.
+    """
+    t0 = time.perf_counter()
+    with span("stt.model_acquire"):
+        slot = _holder.acquire()
+    wait_ms = int((time.perf_counter() - t0) * 1000)
+    cold = _holder.take_cold_start()
+    try:
+        yield slot.model, slot.key, wait_ms, cold
+    finally:
+        _holder.release(slot)
+
+
+@contextmanager
+def _decode_lock() -> Iterator[int]:
+    """Hold transcribe_lock, yielding the ms spent waiting for it.
+
+    The wait and the decode are also recorded as trace spans.
+    """
+    t0 = time.perf_counter()
+    with span("stt.lock_wait"):
+        transcribe_lock.acquire()
+    queue_ms = int((time.perf_counter() - t0) * 1000)
+    try:
+        with span("stt.decode"):
+            yield queue_ms
+    finally:
+        transcribe_lock.release()
+
+
+def load_model() -> None:
+    """Load the configured model now (blocking). No-op if already resident."""
+    _holder.ensure_loaded()
+
+
+def prefetch() -> None:
+    """Start loading the model in the background if it is not resident.
+
+    Called on hotkey press / request arrival so that model load overlaps
+    with recording or upload handling.
+    """
+    if is_loaded() or _holder.is_loading():
+        return
+    threading.Thread(target=_holder.ensure_loaded, daemon=True, name="whisper-prefetch").start()
+
+
+def reload_model() -> bool:
+    """Hot-swap to the model in the current config without downtime.
+
+    Loads the replacement in a background thread; requests keep using the
+    old model until the new one is ready. Returns False if the configured
+    model is already active (or not loaded yet, or a swap is in progress).
+    """
+    key = _model_key(load_config())
+    if _holder.active_key in (None, key) or _holder.is_loading():
+        return False
+    threading.Thread(target=_holder.swap, daemon=True, name="whisper-swap").start()
+    return True
+
+
+def unload() -> bool:
+    """Drop the resident model to free RAM/VRAM. Returns False if none was loaded."""
+    return _holder.unload()
+
+
+def is_loaded() -> bool:
+    return _holder.active_key is not None
+
+
+def idle_seconds() -> float:
+    """Seconds since the model was last requested."""
+    return time.monotonic() - _holder.last_used
+
+
+def model_info() -> dict:
+    key = _holder.active_key
+    return {
+        "model": key[0] if key else None,
+        "device": key[1] if key else None,
+        "compute_type": key[2] if key else None,
+        "loaded": key is not None,
+        "loading": _holder.is_loading(),
+    }
 
 
 _is_tty = hasattr(sys.stdout, "buffer") and hasattr(sys.stdout.buffer, "isatty") and sys.stdout.buffer.isatty()
@@ -56,14 +283,14 @@ def spinner(message: str, stop_event: threading.Event):
 
 def warmup() -> None:
     """Pre-load the Whisper model with a spinner animation."""
-    if _model is not None:
+    if is_loaded():
         return
     stop = threading.Event()
     cfg = load_config()
     t = threading.Thread(target=spinner, args=(f"Loading {cfg['whisper_model']} model...", stop), daemon=True)
     t.start()
     t0 = time.perf_counter()
-    _get_model()
+    load_model()
     elapsed = time.perf_counter() - t0
     stop.set()
     t.join()
@@ -74,17 +301,31 @@ def warmup() -> None:
     sys.stdout.flush()
 
 
-def transcribe(audio: np.ndarray, sample_rate: int = 16000) -> TranscriptionResult:
+def _load_file(file_path: str, trim_leading: bool = True) -> tuple[PreprocessResult, float]:
+    """Decode a file to 16 kHz mono and preprocess it. Returns (result, original duration)."""
+    with span("stt.preprocess"):
+        audio, duration = decode_file(file_path)
+        return preprocess(audio, TARGET_SR, trim_leading=trim_leading), duration
+
+
+def transcribe(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    language: str | None = None,
+    task: str = "transcribe",
+) -> TranscriptionResult:
     """Transcribe audio buffer to text."""
     cfg = load_config()
-    model = _get_model()
     audio_duration = len(audio) / sample_rate
+    with span("stt.preprocess"):
+        prep = preprocess(audio, sample_rate)
 
-    with transcribe_lock:
+    with _use_model() as (model, model_key, wait_ms, cold), _decode_lock() as queue_ms:
         t0 = time.perf_counter()
         segments, info = model.transcribe(
-            audio,
-            language=None,
+            prep.audio,
+            language=language,
+            task=task,
             initial_prompt=cfg["whisper_initial_prompt"],
             vad_filter=True,
         )
@@ -96,6 +337,11 @@ def transcribe(audio: np.ndarray, sample_rate: int = 16000) -> TranscriptionResu
         language=info.language,
         audio_duration_sec=round(audio_duration, 2),
         latency_ms=latency_ms,
+        cold_start=cold,
+        model_wait_ms=wait_ms,
+        trimmed_sec=prep.trimmed_sec,
+        queue_ms=queue_ms,
+        model_key=model_key,
     )
 
 
@@ -106,17 +352,17 @@ def transcribe_file(
 ) -> TranscriptionResult:
     """Transcribe an audio file (M4A, OGG, WAV, etc.) to text.
 
-    faster-whisper accepts file paths directly and decodes via ffmpeg.
-    Thread-safe: acquires transcribe_lock during inference.
+    The file is decoded via ffmpeg and preprocessed before the model is
+    acquired. Thread-safe: acquires transcribe_lock during inference.
     """
     cfg = load_config()
-    model = _get_model()
     lang = language if language and language not in ("auto", "") else None
+    prep, duration = _load_file(file_path)
 
-    with transcribe_lock:
+    with _use_model() as (model, model_key, wait_ms, cold), _decode_lock() as queue_ms:
         t0 = time.perf_counter()
         segments, info = model.transcribe(
-            file_path,
+            prep.audio,
             language=lang,
             task=task,
             initial_prompt=cfg["whisper_initial_prompt"],
@@ -128,6 +374,81 @@ def transcribe_file(
     return TranscriptionResult(
         text=text.strip(),
         language=info.language,
-        audio_duration_sec=round(info.duration, 2),
+        audio_duration_sec=round(duration, 2),
         latency_ms=latency_ms,
+        cold_start=cold,
+        model_wait_ms=wait_ms,
+        trimmed_sec=prep.trimmed_sec,
+        queue_ms=queue_ms,
+        model_key=model_key,
     )
+
+
+def stream_file(
+    file_path: str,
+    info: StreamInfo,
+    language: str | None = None,
+    task: str = "transcribe",
+    word_timestamps: bool = False,
+) -> Iterator:
+    """Yield faster-whisper segments for a file as they are decoded.
+
+    A producer thread consumes the segment generator under transcribe_lock
+    and hands segments over through a queue, so the caller sees the first
+    segment while the rest of the file is still being decoded, but a caller
+    that stops reading (e.g. a stalled HTTP client) never holds the lock.
+    Closing the generator early stops the decode at the next segment.
+    `info` is updated in place; its text/latency are final once iteration
+    finishes. Leading silence is kept so segment timestamps match the
+    original file.
+    """
+    cfg = load_config()
+    lang = language if language and language not in ("auto", "") else None
+    prep, duration = _load_file(file_path, trim_leading=False)
+    info.trimmed_sec = prep.trimmed_sec
+    segments_out: queue.Queue = queue.Queue()  # unbounded: segment text is tiny
+    cancelled = threading.Event()
+    trace = tracing.current()
+
+    def _decode():
+        tracing.attach(trace)
+        try:
+            with _use_model() as (model, info.model_key, info.model_wait_ms, info.cold_start), _decode_lock() as info.queue_ms:
+                t0 = time.perf_counter()
+                segments, whisper_info = model.transcribe(
+                    prep.audio,
+                    language=lang,
+                    task=task,
+                    initial_prompt=cfg["whisper_initial_prompt"],
+                    vad_filter=True,
+                    word_timestamps=word_timestamps,
+                )
+                info.language = whisper_info.language
+                info.audio_duration_sec = round(duration, 2)
+                texts = []
+                try:
+                    for seg in segments:
+                        if cancelled.is_set():
+                            break
+                        texts.append(seg.text.strip())
+                        segments_out.put(seg)
+                finally:
+                    info.text = " ".join(texts).strip()
+                    info.latency_ms = int((time.perf_counter() - t0) * 1000)
+        except Exception as e:  # re-raised in the consumer
+            segments_out.put(e)
+        finally:
+            tracing.attach(None)
+            segments_out.put(_STREAM_END)
+
+    threading.Thread(target=_decode, daemon=True, name="whisper-stream").start()
+    try:
+        while True:
+            item = segments_out.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
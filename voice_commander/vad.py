@@ -0,0 +1,63 @@
+"""Cheap energy-based voice activity detection on float32 PCM."""
+
+import numpy as np
+
+
+def frame_rms_db(audio: np.ndarray, frame_len: int) -> np.ndarray:
+    """Per-frame RMS level in dBFS. A trailing partial frame is dropped."""
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = audio[: n_frames * frame_len].reshape(n_frames, frame_len)
+    # Sum of squares per frame without materializing a squared copy of the audio
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_len)
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+class EnergyVAD:
+    """Frame-level speech/silence gate with hangover.
+
+    Frames above `threshold_db` are speech. After speech, `hangover_ms` of
+    consecutive silence is needed before the gate reports the utterance ended.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        threshold_db: float = -40.0,
+        hangover_ms: int = 600,
+    ):
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self._carry = np.empty(0, dtype=np.float32)
+        self.in_speech = False
+        self._silent_frames = 0
+
+    def process(self, audio: np.ndarray) -> list[str]:
+        """Feed samples; return gate transitions ("start" / "end") in order."""
+        if self._carry.size:
+            audio = np.concatenate([self._carry, audio])
+        levels = frame_rms_db(audio, self.frame_len)
+        self._carry = audio[levels.size * self.frame_len:].copy()
+
+        events = []
+        for is_speech in levels > self.threshold_db:
+            if is_speech:
+                self._silent_frames = 0
+                if not self.in_speech:
+                    self.in_speech = True
+                    events.append("start")
+            elif self.in_speech:
+                self._silent_frames += 1
+                if self._silent_frames >= self.hangover_frames:
+                    self.in_speech = False
+                    self._silent_frames = 0
+                    events.append("end")
+        return events
+
+    def reset(self) -> None:
+        self._carry = np.empty(0, dtype=np.float32)
+        self.in_speech = False
+        self._silent_frames = 0
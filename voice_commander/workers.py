@@ -0,0 +1,315 @@
+"""Pre-started ASR worker processes with shared-memory audio handoff.
+
+The front process (HTTP server) decodes uploads to 16 kHz float32 PCM
+(see preprocess.decode_file) and copies them into a
+`multiprocessing.shared_memory` block; only the block name and sample
+count travel through the queue, never the array itself.
+Each worker owns its own WhisperModel, is pinned to a disjoint set of
+the cores this process may run on, and is restarted by a supervisor
+thread if it dies, with exponential backoff. A worker that keeps dying
+before its model is ready (bad whisper_model, out of memory) is given up
+on and reported in stats().
+"""
+
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .config import get_overrides, load_config, set_overrides
+from .preprocess import decode_file
+from .transcriber import TranscriptionResult
+
+log = logging.getLogger("voice_commander.workers")
+
+SAMPLE_RATE = 16000
+_SUPERVISE_INTERVAL = 1.0
+_MAX_RESTART_BACKOFF = 60.0
+_MAX_START_FAILURES = 5  # consecutive deaths before becoming ready
+_RELOAD = "reload"
+
+
+class WorkerUnavailable(RuntimeError):
+    """The job's worker died, or no worker is up; retrying later may succeed."""
+
+
+def _worker_main(index: int, cores: list[int], overrides: dict, tasks, results) -> None:
+    """Worker process body: load a model, then serve jobs until a None arrives."""
+    if cores and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            log.warning("Worker %d: could not pin to cores %s (%s); running unpinned", index, cores, e)
+    set_overrides(**overrides)
+
+    from . import transcriber
+
+    try:
+        transcriber.load_model()
+    except Exception as e:  # exit cleanly; the supervisor decides whether to retry
+        results.put(("failed", index, f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", index, None))
+
+    while True:
+        job = tasks.get()
+        if job is None:
+            return
+        if job[0] == _RELOAD:
+            results.put(("reloaded", index, transcriber.reload_model()))
+            continue
+        job_id, shm_name, n_samples, language, task = job
+        t0 = time.perf_counter()
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)
+            result = transcriber.transcribe(audio, SAMPLE_RATE, language=language, task=task)
+            del audio
+            busy_ms = int((time.perf_counter() - t0) * 1000)
+            results.put(("done", job_id, (result.__dict__, busy_ms)))
+        except Exception as e:  # report to the front instead of killing the worker
+            results.put(("error", job_id, f"{type(e).__name__}: {e}"))
+        finally:
+            shm.close()
+
+
+class _Worker:
+    def __init__(self, index: int, cores: list[int]):
+        self.index = index
+        self.cores = cores
+        self.tasks = None
+        self.process = None
+        self.ready = False
+        self.inflight: set[int] = set()
+        self.restarts = 0
+        self.failures = 0  # deaths since the worker was last ready
+        self.failed = False  # gave up after _MAX_START_FAILURES
+        self.error: str | None = None  # why the last start or run failed
+        self.respawn_at: float | None = None  # restart pending until this monotonic time
+
+
+class WorkerPool:
+    """N model-owning worker processes behind a least-loaded dispatcher."""
+
+    def __init__(self, n_workers: int, cores_per_worker: int = 0):
+        self._ctx = mp.get_context("spawn")
+        self._results = self._ctx.Queue()
+        # cpu_count() reports host CPUs even under a cgroup cpuset or taskset
+        if hasattr(os, "sched_getaffinity"):
+            allowed = sorted(os.sched_getaffinity(0))
+        else:
+            allowed = list(range(os.cpu_count() or 1))
+        per = cores_per_worker or max(1, len(allowed) // n_workers)
+        self._workers = [
+            _Worker(i, [allowed[(i * per + c) % len(allowed)] for c in range(per)])
+            for i in range(n_workers)
+        ]
+        self._cores_per_worker = per
+        self._jobs: dict[int, tuple[Future, shared_memory.SharedMemory, _Worker, float]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._settled = threading.Event()  # every worker is ready or given up on
+        self._reloads: queue.Queue = queue.Queue()
+        self._stopping = False
+
+    # ── Lifecycle ─────────────────────────────────────────────
+
+    def start(self) -> None:
+        for worker in self._workers:
+            self._spawn(worker)
+        threading.Thread(target=self._collect, daemon=True, name="worker-results").start()
+        threading.Thread(target=self._supervise, daemon=True, name="worker-supervisor").start()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until every worker is ready or given up on. True if any worker is ready."""
+        self._settled.wait(timeout)
+        return any(w.ready for w in self._workers)
+
+    def stop(self) -> None:
+        self._stopping = True
+        for worker in self._workers:
+            worker.tasks.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def _spawn(self, worker: _Worker) -> None:
+        cfg = load_config()
+        overrides = {**get_overrides(), "whisper_cpu_threads": cfg["whisper_cpu_threads"] or self._cores_per_worker}
+        worker.tasks = self._ctx.Queue()
+        worker.ready = False
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.index, worker.cores, overrides, worker.tasks, self._results),
+            daemon=True,
+            name=f"asr-worker-{worker.index}",
+        )
+        worker.process.start()
+        log.info("Started worker %d (pid %d, cores %s)", worker.index, worker.process.pid, worker.cores)
+
+    # ── Jobs ──────────────────────────────────────────────────
+
+    def submit(self, audio: np.ndarray, language: str | None = None, task: str = "transcribe") -> Future:
+        """Queue 16 kHz mono PCM for decoding; the Future yields a TranscriptionResult."""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+
+        future: Future = Future()
+        with self._lock:
+            # Before startup completes, queue on workers still loading
+            candidates = [w for w in self._workers if w.ready] or [
+                w for w in self._workers if not w.failed and w.respawn_at is None
+            ]
+            if not candidates:
+                shm.close()
+                shm.unlink()
+                raise WorkerUnavailable("No ASR worker available")
+            worker = min(candidates, key=lambda w: len(w.inflight))
+            job_id = next(self._ids)
+            self._jobs[job_id] = (future, shm, worker, time.perf_counter())
+            worker.inflight.add(job_id)
+        worker.tasks.put((job_id, shm.name, audio.size, language, task))
+        return future
+
+    def reload_model(self, timeout: float = 5.0) -> bool:
+        """Ask every worker to hot-swap to the model in config.json.
+
+        Returns True if any worker started a swap. A worker still busy with a
+        job after `timeout` is counted as swapping; it reloads when the job ends.
+        """
+        while not self._reloads.empty():
+            self._reloads.get_nowait()  # late replies from an earlier call
+        # Workers still starting load the new config anyway; failed ones stay down
+        live = [w for w in self._workers if w.ready]
+        for worker in live:
+            worker.tasks.put((_RELOAD,))
+        started = False
+        deadline = time.monotonic() + timeout
+        for _ in live:
+            try:
+                started |= self._reloads.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return True
+        return started
+
+    def transcribe(self, audio: np.ndarray, language: str | None = None, task: str = "transcribe") -> TranscriptionResult:
+        return self.submit(audio, language=language, task=task).result()
+
+    def transcribe_file(self, file_path: str, language: str | None = None, task: str = "transcribe") -> TranscriptionResult:
+        """Decode a file in the front process and transcribe it on a worker."""
+        lang = language if language and language not in ("auto", "") else None
+        audio, _ = decode_file(file_path)
+        return self.transcribe(audio, language=lang, task=task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": [
+                    {
+                        "index": w.index,
+                        "pid": w.process.pid if w.process else None,
+                        "alive": bool(w.process and w.process.is_alive()),
+                        "ready": w.ready,
+                        "inflight": len(w.inflight),
+                        "restarts": w.restarts,
+                        "failed": w.failed,
+                        "error": w.error,
+                        "cores": w.cores,
+                    }
+                    for w in self._workers
+                ],
+            }
+
+    # ── Background threads ────────────────────────────────────
+
+    def _collect(self) -> None:
+        while True:
+            kind, ident, payload = self._results.get()
+            if kind == "ready":
+                with self._lock:
+                    worker = self._workers[ident]
+                    worker.ready = True
+                    worker.failures = 0
+                    worker.error = None
+                self._check_settled()
+                continue
+            if kind == "failed":
+                self._workers[ident].error = payload
+                continue
+            if kind == "reloaded":
+                self._reloads.put(payload)
+                continue
+            self._complete(ident, kind, payload)
+
+    def _complete(self, job_id: int, kind: str, payload) -> None:
+        with self._lock:
+            entry = self._jobs.pop(job_id, None)
+            if entry is None:
+                return
+            future, shm, worker, submitted = entry
+            worker.inflight.discard(job_id)
+        shm.close()
+        shm.unlink()
+        if kind == "done":
+            fields, busy_ms = payload
+            result = TranscriptionResult(**fields)
+            # Time in the worker's task queue plus IPC, on top of any lock wait inside the worker
+            elapsed_ms = int((time.perf_counter() - submitted) * 1000)
+            result.queue_ms += max(0, elapsed_ms - busy_ms)
+            future.set_result(result)
+        elif kind == "lost":
+            future.set_exception(WorkerUnavailable(f"ASR worker lost: {payload}"))
+        else:
+            future.set_exception(RuntimeError(f"ASR worker error: {payload}"))
+
+    def _check_settled(self) -> None:
+        with self._lock:
+            if all(w.ready or w.failed for w in self._workers):
+                self._settled.set()
+
+    def _supervise(self) -> None:
+        while not self._stopping:
+            time.sleep(_SUPERVISE_INTERVAL)
+            for worker in self._workers:
+                if self._stopping or worker.failed:
+                    continue
+                if worker.respawn_at is not None:
+                    if time.monotonic() >= worker.respawn_at:
+                        worker.respawn_at = None
+                        worker.restarts += 1
+                        self._spawn(worker)
+                elif not worker.process.is_alive():
+                    self._handle_death(worker)
+
+    def _handle_death(self, worker: _Worker) -> None:
+        """Fail the dead worker's jobs, then schedule a restart or give up on it."""
+        with self._lock:
+            worker.ready = False
+            lost = list(worker.inflight)
+        for job_id in lost:
+            self._complete(job_id, "lost", "worker process died")
+        worker.error = worker.error or f"exited with code {worker.process.exitcode}"
+        worker.failures += 1
+        if worker.failures >= _MAX_START_FAILURES:
+            worker.failed = True
+            log.error(
+                "Worker %d died %d times without becoming ready (%s); giving up",
+                worker.index, worker.failures, worker.error,
+            )
+            self._check_settled()
+            return
+        delay = min(_MAX_RESTART_BACKOFF, _SUPERVISE_INTERVAL * 2 ** (worker.failures - 1))
+        log.warning(
+            "Worker %d (pid %d) died: %s; restarting in %.0fs",
+            worker.index, worker.process.pid, worker.error, delay,
+        )
+        worker.respawn_at = time.monotonic() + delay